@@ -1,13 +1,31 @@
 """
 Agents package -- chat team members and team assembly.
 
-Re-exports everything so `from agents import content_writer` works.
+Re-exports everything so `from agents import content_writer` works. Each name
+is built by its module's build_*() function on first access and then reused,
+so importing this package doesn't import agno or build any agent.
 """
 
-# Team members
-from .content_writer import content_writer
-from .image_finder import image_finder
-from .aio_analyzer import aio_analyzer
+import importlib
+import threading
 
-# Team assembly
-from .team import team
+_EXPORTS = ("content_writer", "image_finder", "aio_analyzer", "team")
+_built: dict = {}
+_build_lock = threading.RLock()  # Re-entrant: building the team builds its members
+
+
+def __getattr__(name: str):
+    # Only called while the name is unbound, i.e. the first time it is used
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _build_lock:
+        if name not in _built:
+            module = importlib.import_module(f".{name}", __name__)
+            try:
+                _built[name] = getattr(module, f"build_{name}")()
+            except BaseException:
+                # The submodule import bound its name here -- unbind it so the next access retries
+                globals().pop(name, None)
+                raise
+        globals()[name] = _built[name]
+        return _built[name]
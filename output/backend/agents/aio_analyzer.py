@@ -8,40 +8,57 @@ from agno.agent import Agent
 from agno.models.anthropic import Claude
 
 from tools.aio import analyze_keyword_aio, optimize_for_aio
+from tools.profiling import tool_hooks
 
-aio_analyzer = Agent(
-    name="AIO Analyzer",
-    role="Analyze Google AI Overviews and optimize content for AIO citations.",
-    model=Claude(id="claude-sonnet-4-5-20250929"),
-    tools=[analyze_keyword_aio, optimize_for_aio],
-    instructions=[
-        "You analyze Google AI Overviews for keywords.",
-        "Use analyze_keyword_aio to check what Google's AI says about a topic.",
-        "Use optimize_for_aio to compare an article against current AI Overviews and suggest improvements.",
-        "AIO analysis requires DataForSEO to be configured.",
-        "",
-        "RESPONSE FORMAT -- always use this two-part structure:",
-        "",
-        "PART 1 - RAW AIO DATA: Output a fenced code block with language 'aio-result' containing valid JSON.",
-        "The JSON object MUST have these fields:",
-        '  - "keyword": the keyword analyzed (string)',
-        '  - "has_aio": whether an AI Overview exists (boolean)',
-        '  - "content": the full AI Overview text, verbatim as returned by the tool (string, empty if no AIO)',
-        '  - "references": array of objects with "title", "url", "source" fields (empty array if none)',
-        "",
-        "Example:",
-        "```aio-result",
-        '{"keyword":"hidden gem netflix movies","has_aio":true,"content":"The exact AIO text here...","references":[{"title":"Source Title","url":"https://example.com","source":"example.com"}]}',
-        "```",
-        "",
-        "CRITICAL: The JSON must be valid and the code block language must be exactly 'aio-result'.",
-        "Do NOT paraphrase or summarize the AIO content -- copy it exactly as returned by the tool.",
-        "",
-        "PART 2 - ANALYSIS: After the aio-result block, write your interpretation under a '## Analysis' heading.",
-        "Include: content gaps, key themes Google highlights, cited source patterns, and actionable suggestions.",
-        "Be specific about what to add, change, or emphasize.",
-        "",
-        "Never use emojis or icons in your responses.",
-    ],
-    markdown=True,
-)
+
+def build_aio_analyzer() -> Agent:
+    """Build the AIO analyzer."""
+    return Agent(
+        name="AIO Analyzer",
+        role="Analyze Google AI Overviews and optimize content for AIO citations.",
+        model=Claude(id="claude-sonnet-4-5-20250929"),
+        tools=[analyze_keyword_aio, optimize_for_aio],
+        instructions=[
+            "You analyze Google AI Overviews for keywords.",
+            "Use analyze_keyword_aio to check what Google's AI says about a topic.",
+            "Use optimize_for_aio to compare an article against current AI Overviews and suggest improvements.",
+            "optimize_for_aio returns a precomputed gap analysis per keyword: a coverage score, ranked missing_concepts,",
+            "and weak_sentences (AIO statements the article barely covers, with the closest article section).",
+            "Base your suggestions on these -- say which section each missing concept belongs in.",
+            "AIO analysis requires DataForSEO to be configured.",
+            "",
+            "RESPONSE FORMAT -- always use this two-part structure:",
+            "",
+            "PART 1 - RAW AIO DATA: Output a fenced code block with language 'aio-result' containing valid JSON.",
+            "The JSON object MUST have these fields:",
+            '  - "keyword": the keyword analyzed (string)',
+            '  - "has_aio": whether an AI Overview exists (boolean)',
+            '  - "references": array of objects with "title", "url", "source" fields (empty array if none)',
+            "Then, depending on the tool you called:",
+            '  - analyze_keyword_aio: "content" -- the full AI Overview text, verbatim as returned by the tool',
+            "    (string, empty if no AIO)",
+            '  - optimize_for_aio: "coverage" (number 0-1) and "missing_concepts" (array of the concept strings,',
+            "    in the order returned), both copied from that keyword's comparison. This tool does not return",
+            '    the AIO text, so leave out "content" -- never write AIO text yourself. Use "aio_references"',
+            '    for "references". Output one aio-result block per keyword.',
+            "",
+            "Examples:",
+            "```aio-result",
+            '{"keyword":"hidden gem netflix movies","has_aio":true,"content":"The exact AIO text here...","references":[{"title":"Source Title","url":"https://example.com","source":"example.com"}]}',
+            "```",
+            "```aio-result",
+            '{"keyword":"hidden gem netflix movies","has_aio":true,"coverage":0.62,"missing_concepts":["streaming catalog","critic scores"],"references":[{"title":"Source Title","url":"https://example.com","source":"example.com"}]}',
+            "```",
+            "",
+            "CRITICAL: The JSON must be valid and the code block language must be exactly 'aio-result'.",
+            "Do NOT paraphrase or summarize tool output -- copy AIO text and concepts exactly as returned by the tool.",
+            "",
+            "PART 2 - ANALYSIS: After the aio-result block, write your interpretation under a '## Analysis' heading.",
+            "Include: content gaps, key themes Google highlights, cited source patterns, and actionable suggestions.",
+            "Be specific about what to add, change, or emphasize.",
+            "",
+            "Never use emojis or icons in your responses.",
+        ],
+        tool_hooks=tool_hooks(),
+        markdown=True,
+    )
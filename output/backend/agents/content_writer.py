@@ -8,33 +8,46 @@ from agno.agent import Agent
 from agno.models.anthropic import Claude
 
 from tools.aio import get_dataforseo_credentials
+from tools.analytics import analyze_catalog
+from tools.profiling import tool_hooks
+from tools.research import lookup_research
 from tools.search import DataForSEOSearchTools
 from tools.storage import save_article, list_all_articles
 
-_tools = [save_article, list_all_articles]
-_creds = get_dataforseo_credentials()
-if _creds:
-    _tools.insert(0, DataForSEOSearchTools(login=_creds[0], password=_creds[1]))
 
-content_writer = Agent(
-    name="Content Writer",
-    role="Research topics and write SEO articles",
-    model=Claude(id="claude-sonnet-4-5-20250929"),
-    tools=_tools,
-    instructions=[
-        "You research topics and write comprehensive SEO articles.",
-        "RESEARCH: Do 1-2 web searches max per article -- one broad search for the main topic, optionally one more for a specific angle. Do NOT over-research.",
-        "Write a well-structured Markdown article with:",
-        "  - An H1 title",
-        "  - 5-8 H2 section headings",
-        "  - H3 subheadings where appropriate",
-        "  - Bolded important keywords naturally within the text",
-        "  - Bullet/numbered lists where helpful",
-        "  - A compelling introduction and conclusion",
-        "  - 1500-2500 words of engaging content",
-        "After writing, call save_article with the topic, full article text, and target keywords.",
-        "When asked to list articles, use list_all_articles.",
-        "Never use emojis or icons.",
-    ],
-    markdown=True,
-)
+def build_content_writer() -> Agent:
+    """Build the content writer. Search tools are added when DataForSEO credentials are set."""
+    tools = [save_article, list_all_articles, analyze_catalog]
+    creds = get_dataforseo_credentials()
+    if creds:
+        tools[:0] = [lookup_research, DataForSEOSearchTools(login=creds[0], password=creds[1])]
+
+    return Agent(
+        name="Content Writer",
+        role="Research topics and write SEO articles",
+        model=Claude(id="claude-sonnet-4-5-20250929"),
+        tools=tools,
+        instructions=[
+            "You research topics and write comprehensive SEO articles.",
+            "RESEARCH: Do 1-2 web searches max per article -- one broad search for the main topic, optionally one more for a specific angle. Do NOT over-research.",
+            "Before searching, call lookup_research with the topic. Related articles in the same batch share research --",
+            "if it returns relevant results, write from them and only search for the angle they don't cover.",
+            "Write a well-structured Markdown article with:",
+            "  - An H1 title",
+            "  - 5-8 H2 section headings",
+            "  - H3 subheadings where appropriate",
+            "  - Bolded important keywords naturally within the text",
+            "  - Bullet/numbered lists where helpful",
+            "  - A compelling introduction and conclusion",
+            "  - 1500-2500 words of engaging content",
+            "After writing, call save_article with the topic, full article text, and target keywords.",
+            "When asked to list articles, use list_all_articles.",
+            "Check for cannibalization before writing: a batch task carries plan_batch's existing_articles, and lookup_research returns existing_articles too.",
+            "If an existing article already targets your keywords, say so and pick a distinct angle or keyword set instead of duplicating it.",
+            "Only when you have neither (no existing_articles in the task and no lookup_research tool), call analyze_catalog('cannibalization', keywords=<your comma-separated target keywords>) first.",
+            "When asked about duplicates, heading structure, or catalog stats, use analyze_catalog with 'duplicates', 'headings', or 'summary'.",
+            "Never use emojis or icons.",
+        ],
+        tool_hooks=tool_hooks(),
+        markdown=True,
+    )
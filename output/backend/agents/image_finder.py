@@ -11,6 +11,7 @@ from agno.models.anthropic import Claude
 
 from tools.aio import get_dataforseo_credentials
 from tools.images import DataForSEOImageTools
+from tools.profiling import tool_hooks
 from tools.storage import get_article_content, update_article_content
 
 
@@ -35,8 +36,6 @@ def build_image_finder() -> Agent | None:
             "Do not change the article text -- only add image lines.",
             "Never use emojis or icons.",
         ],
+        tool_hooks=tool_hooks(),
         markdown=True,
     )
-
-
-image_finder = build_image_finder()
@@ -4,19 +4,50 @@ SEO Workspace — FastAPI backend via Agno AgentOS.
 Serves the team at 50+ auto-generated endpoints (chat, sessions, health, docs)
 plus custom routes for the article storage layer.
 
+create_app() is uvicorn's app factory and runs in the serving process only
+(the reloader parent never calls it). It does not import agno: /health, the
+article routes and the frontend answer right away. The team, its session DB
+and the AgentOS routes (sessions, /teams/..., /docs) are built in a thread
+the first time a request needs them -- the first chat or AgentOS call waits
+for that (~3s, mostly importing anthropic and agno).
+
 Usage:
-    python output/backend/serve.py     (from project root)
+    python output/backend/serve.py                    (from project root, auto-reload)
+    python output/backend/serve.py --workers 4        (production: N workers, no reload)
+    python output/backend/serve.py --profile-imports  (startup import-time report)
+
+Production workers (started by `start.py --prod`) also serve the built
+frontend from output/frontend/dist. On SIGTERM or SIGINT (SIGBREAK on
+Windows) a worker drains. Article event streams close, new chats get a 503,
+and in-flight chat streams get up to SHUTDOWN_DRAIN_SECONDS to finish.
+
+Settings (optional, read from the environment):
+  SHUTDOWN_DRAIN_SECONDS  -- how long in-flight chats may run after SIGTERM (default 120)
+  SERVE_FRONTEND          -- "1" to serve output/frontend/dist (set by --workers)
+  ADMIN_TOKEN             -- enables /api/admin profiling routes (send as X-Admin-Token)
+  SLOW_REQUEST_MS         -- slow-request capture threshold (see tools/profiling.py)
+  ANALYTICS_WARMUP        -- "0" to skip building the analytics cache at startup
 """
 
+import argparse
+import asyncio
+import hmac
 import json
+import logging
 import os
+import signal
 import sys
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
+from starlette.routing import Match, Mount
 
 load_dotenv()
 
@@ -28,14 +59,140 @@ def validate_api_keys():
         sys.exit(1)
 
 
-validate_api_keys()
+import agents
+from tools.history import history_report
+from tools.revisions import diff_revisions, get_revision, list_revisions, restore_revision, storage_stats
+from tools.sessions import session_store_report, start_background_maintenance
+from tools import async_storage, events, profiling, transfer
+
+_FRONTEND_DIST = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "frontend", "dist"))
+_STARTED_AT = datetime.now(timezone.utc)
+
+# uvicorn's server logger: set up in every worker without importing agno
+logger = logging.getLogger("uvicorn.error")
+
+# Graceful shutdown state (per worker process)
+_draining = False
+_active_chats = 0
+
+
+def _drain_seconds() -> int:
+    try:
+        return max(0, int(os.getenv("SHUTDOWN_DRAIN_SECONDS", "").strip() or 120))
+    except ValueError:
+        return 120
+
+
+def _install_drain_handlers():
+    """Start draining on SIGTERM/SIGINT/SIGBREAK, then hand the signal to uvicorn's own handler."""
+    signals = [signal.SIGTERM, signal.SIGINT]
+    if hasattr(signal, "SIGBREAK"):
+        signals.append(signal.SIGBREAK)  # What start.py sends on Windows, where SIGTERM can't be caught
+    for sig in signals:
+        previous = signal.getsignal(sig)
+
+        def handle(signum, frame, previous=previous):
+            global _draining
+            if not _draining:
+                _draining = True
+                logger.info(f"Draining: {_active_chats} chat stream(s) in flight")
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sig, handle)
+
+# ============================================================
+# AgentOS (built on first use)
+# ============================================================
+
+_agent_os_app = None
+_agent_os_task = None               # Runs the AgentOS app's lifespan
+_agent_os_lock = asyncio.Lock()
+_agent_os_stop = asyncio.Event()
 
-from agno.os import AgentOS
-from agents.team import team
-from tools.storage import get_article, list_articles, _load_metadata, _md_path, _lock, _save_metadata
 
-# Custom FastAPI app with article routes
-base_app = FastAPI(title="SEO Workspace", version="1.0.0")
+def _build_agent_os() -> FastAPI:
+    """Build the team and its AgentOS app. Imports agno and anthropic, so it runs in a thread."""
+    from agno.os import AgentOS
+
+    app = AgentOS(teams=[agents.team]).get_app()
+    # Only so /docs lists the article routes too -- requests for them never get here
+    app.router.routes.extend(r for r in base_app.routes if isinstance(r, APIRoute))
+    return app
+
+
+async def _run_agent_os_lifespan(app: FastAPI, started: asyncio.Event):
+    """Run the AgentOS app's lifespan in one task, from startup until the worker shuts down."""
+    async with app.router.lifespan_context(app):
+        started.set()
+        await _agent_os_stop.wait()
+
+
+async def _agent_os() -> FastAPI:
+    """The AgentOS app, built and started the first time a request needs it."""
+    global _agent_os_app, _agent_os_task
+    if _agent_os_app is None:
+        async with _agent_os_lock:
+            if _agent_os_app is None:
+                app = await asyncio.to_thread(_build_agent_os)
+                started = asyncio.Event()
+                task = asyncio.create_task(_run_agent_os_lifespan(app, started))
+                waiter = asyncio.create_task(started.wait())
+                await asyncio.wait([task, waiter], return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if task.done():
+                    task.result()  # Startup failed -- raise its error (the next request retries)
+                _agent_os_task, _agent_os_app = task, app
+    return _agent_os_app
+
+
+async def _team():
+    """The team, built in a thread on first use so the event loop keeps serving meanwhile."""
+    return await asyncio.to_thread(getattr, agents, "team")
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    yield
+    _agent_os_stop.set()
+    if _agent_os_task is not None:
+        await _agent_os_task
+
+
+def _frontend_file(path: str) -> bool:
+    """Whether the mounted frontend has a file for this path."""
+    if path == "/":
+        path = "/index.html"
+    return os.path.isfile(os.path.join(_FRONTEND_DIST, path.lstrip("/")))
+
+
+class _AgentOSFallback:
+    """ASGI app: base_app's routes (and frontend files) first, everything else to AgentOS."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _serves(self, scope) -> bool:
+        for route in self.app.router.routes:
+            if isinstance(route, Mount):
+                if _frontend_file(scope["path"]):
+                    return True
+            elif route.matches(scope)[0] != Match.NONE:
+                return True  # PARTIAL is a wrong method -- base_app answers 405
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and not self._serves(scope):
+            await (await _agent_os())(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# Custom FastAPI app with article routes. Its own docs are off: /docs is AgentOS's.
+base_app = FastAPI(
+    title="SEO Workspace", version="1.0.0", lifespan=_lifespan,
+    docs_url=None, redoc_url=None, openapi_url=None,
+)
 
 base_app.add_middleware(
     CORSMiddleware,
@@ -46,27 +203,77 @@ base_app.add_middleware(
 )
 
 
+@base_app.get("/health")
+async def api_health():
+    """Liveness check, answered without building the team (replaces AgentOS's /health)."""
+    return {"status": "ok", "instantiated_at": _STARTED_AT.isoformat()}
+
+
 @base_app.get("/api/articles")
 async def api_list_articles():
     """List all articles with metadata (no content)."""
-    articles = list_articles()
-    return [
-        {
-            "id": a["id"],
-            "topic": a["topic"],
-            "status": a["status"],
-            "word_count": a["word_count"],
-            "created_at": a["created_at"],
-            "updated_at": a["updated_at"],
-        }
-        for a in articles
-    ]
+    # Already serialized by storage (and cached until articles.json changes)
+    return Response(await async_storage.listing_json(), media_type="application/json")
+
+
+@base_app.get("/api/articles/events")
+async def api_article_events():
+    """Stream article created/updated/deleted events via SSE.
+
+    Declared before /api/articles/{article_id} so "events" isn't taken as an ID.
+    The stream ends when the worker starts draining, so it can't hold up shutdown
+    (EventSource reconnects to another worker).
+    """
+
+    async def generate():
+        queue = events.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            idle = 0
+            while not _draining:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=1)
+                except asyncio.TimeoutError:
+                    idle += 1
+                    if idle >= 15:
+                        idle = 0
+                        yield ": keepalive\n\n"
+                    continue
+                idle = 0
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            events.unsubscribe(queue)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@base_app.get("/api/articles/export")
+def api_export_articles(format: str = "ndjson"):
+    """Stream the whole catalog as NDJSON, tar.gz, or zip (a consistent snapshot).
+
+    Declared before /api/articles/{article_id} so "export" isn't taken as an ID.
+    """
+    if format not in transfer.FORMATS:
+        return JSONResponse(
+            {"error": f"Unknown format '{format}'. Use one of: {', '.join(transfer.FORMATS)}."},
+            status_code=400,
+        )
+    media_type, extension = transfer.FORMATS[format]
+    return StreamingResponse(
+        transfer.export_chunks(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="articles.{extension}"'},
+    )
 
 
 @base_app.get("/api/articles/{article_id}")
 async def api_get_article(article_id: str):
     """Get a single article with full content."""
-    article = get_article(article_id)
+    article = await async_storage.get_article(article_id)
     if not article:
         return {"error": f"Article {article_id} not found."}
     return article
@@ -75,18 +282,94 @@ async def api_get_article(article_id: str):
 @base_app.delete("/api/articles/{article_id}")
 async def api_delete_article(article_id: str):
     """Delete an article (metadata + .md file)."""
-    with _lock:
-        metadata = _load_metadata()
-        if article_id not in metadata:
-            return {"error": f"Article {article_id} not found."}
-        del metadata[article_id]
-        _save_metadata(metadata)
+    if not await async_storage.delete_article(article_id):
+        return {"error": f"Article {article_id} not found."}
+    return {"deleted": article_id}
 
-    md_file = _md_path(article_id)
-    if os.path.exists(md_file):
-        os.remove(md_file)
 
-    return {"deleted": article_id}
+@base_app.get("/api/analytics")
+def api_analytics_summary():
+    """Catalog-wide word count, heading, and keyword density distributions."""
+    # NumPy loads on the first analytics import: here, the startup warm-up thread, or building the team
+    from tools.analytics import summary_report
+
+    return summary_report()
+
+
+@base_app.get("/api/analytics/duplicates")
+def api_analytics_duplicates(threshold: float = 0.8, limit: int = 50):
+    """Near-duplicate article pairs."""
+    from tools.analytics import duplicates_report
+
+    return duplicates_report(threshold=threshold, limit=limit)
+
+
+@base_app.get("/api/analytics/cannibalization")
+def api_analytics_cannibalization(min_overlap: float = 0.5, limit: int = 50, keywords: str = ""):
+    """Articles competing for the same target keywords (or only with `keywords`, comma-separated)."""
+    from tools.analytics import cannibalization_report
+
+    wanted = [k for k in keywords.split(",") if k.strip()] if keywords.strip() else None
+    return cannibalization_report(min_overlap=min_overlap, limit=limit, keywords=wanted)
+
+
+@base_app.get("/api/analytics/headings")
+def api_analytics_headings(limit: int = 100):
+    """Articles with heading structure problems."""
+    from tools.analytics import headings_report
+
+    return headings_report(limit=limit)
+
+
+@base_app.get("/api/sessions/report")
+def api_session_report():
+    """Size and lookup latency of the chat session store."""
+    return session_store_report()
+
+
+@base_app.get("/api/sessions/{session_id}/history-report")
+def api_history_report(session_id: str):
+    """Raw vs compacted history the leader would get next turn, for a session."""
+    return history_report(session_id)
+
+
+@base_app.get("/api/articles/{article_id}/revisions")
+async def api_list_revisions(article_id: str):
+    """Revision history for an article (no content) plus storage overhead."""
+    revisions = await async_storage.run_io(list_revisions, article_id)
+    stats = await async_storage.run_io(storage_stats, article_id)
+    return {"article_id": article_id, "revisions": revisions, "storage": stats}
+
+
+@base_app.get("/api/articles/{article_id}/revisions/{rev}")
+async def api_get_revision(article_id: str, rev: int):
+    """Full Markdown of one revision."""
+    try:
+        content = await async_storage.run_io(get_revision, article_id, rev)
+    except ValueError as e:
+        return {"error": str(e)}
+    if content is None:
+        return {"error": f"Revision {rev} of {article_id} not found."}
+    return {"article_id": article_id, "rev": rev, "article_markdown": content}
+
+
+@base_app.get("/api/articles/{article_id}/revisions/{rev}/diff")
+async def api_diff_revision(article_id: str, rev: int, against: int | None = None):
+    """Unified diff from `against` (default: the previous revision) to `rev`."""
+    base = against if against is not None else rev - 1
+    try:
+        diff = await async_storage.run_io(diff_revisions, article_id, base, rev)
+    except ValueError as e:
+        return {"error": str(e)}
+    if diff is None:
+        return {"error": f"Revisions {base} and {rev} of {article_id} not found."}
+    return {"article_id": article_id, "from": base, "to": rev, "diff": diff}
+
+
+@base_app.post("/api/articles/{article_id}/revisions/{rev}/restore")
+async def api_restore_revision(article_id: str, rev: int):
+    """Make an old revision the current content (recorded as a new revision)."""
+    return json.loads(await async_storage.run_io(restore_revision, article_id, rev))
 
 
 class ChatRequest(BaseModel):
@@ -102,12 +385,20 @@ async def api_chat_stream(req: ChatRequest):
     team.arun() (non-streaming) and wrap the result in SSE events that
     the frontend can parse with the same ReadableStream logic.
     """
+    if _draining:
+        return JSONResponse({"error": "Server is shutting down. Try again."}, status_code=503)
 
     async def generate():
-        # Signal that we've started
-        yield f"event: TeamRunStarted\ndata: {json.dumps({'event': 'TeamRunStarted'})}\n\n"
-
+        global _active_chats
+        _active_chats += 1
         try:
+            # Signal that we've started. started_at has the same format as an
+            # article's created_at, so the frontend can find the run's articles in the listing.
+            started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            started = {"event": "TeamRunStarted", "started_at": started_at}
+            yield f"event: TeamRunStarted\ndata: {json.dumps(started)}\n\n"
+
+            team = await _team()
             response = await team.arun(req.message, session_id=req.session_id)
 
             # Extract the response content
@@ -128,17 +419,140 @@ async def api_chat_stream(req: ChatRequest):
 
         except Exception as e:
             yield f"event: TeamRunError\ndata: {json.dumps({'event': 'TeamRunError', 'content': str(e)})}\n\n"
+        finally:
+            _active_chats -= 1
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
 
-# Wrap with AgentOS
-agent_os = AgentOS(
-    teams=[team],
-    base_app=base_app,
-)
+# ============================================================
+# Admin: profiling and slow-request capture (tools/profiling.py)
+# ============================================================
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    token = profiling.admin_token()
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")  # Admin routes are off
+    if not hmac.compare_digest((x_admin_token or "").encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+
+admin = APIRouter(prefix="/api/admin", dependencies=[Depends(require_admin)])
+
+
+def _flamegraph_text(text: str | None, filename: str):
+    if text is None:
+        return JSONResponse({"error": "No profile data."}, status_code=404)
+    return PlainTextResponse(text, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@admin.get("/profile")
+def api_profile_status():
+    """Status of the current (or last) sampling window."""
+    return {"pid": os.getpid(), **profiling.window_status()}
+
+
+@admin.post("/profile/start")
+def api_profile_start(seconds: float = 30):
+    """Sample every thread's stack for `seconds` (max 300)."""
+    return {"pid": os.getpid(), **profiling.start_window(seconds)}
+
+
+@admin.post("/profile/stop")
+def api_profile_stop():
+    return {"pid": os.getpid(), **profiling.stop_window()}
+
+
+@admin.get("/profile/collapsed")
+def api_profile_collapsed():
+    """Sampling window result as collapsed stacks (flamegraph.pl / speedscope)."""
+    return _flamegraph_text(profiling.window_collapsed(), f"profile-{os.getpid()}.collapsed")
+
+
+@admin.get("/slow")
+def api_slow_requests():
+    """Requests slower than SLOW_REQUEST_MS, newest first."""
+    return {"pid": os.getpid(), "requests": profiling.slow_requests()}
+
+
+@admin.get("/slow/{request_id}")
+def api_slow_request(request_id: int):
+    """One slow request with its tool-call timeline."""
+    record = profiling.slow_request(request_id)
+    if record is None:
+        return {"error": f"Slow request {request_id} not found in worker {os.getpid()}."}
+    return record
+
+
+@admin.get("/slow/{request_id}/collapsed")
+def api_slow_request_collapsed(request_id: int):
+    """Stacks sampled while a slow request ran, as collapsed stacks."""
+    return _flamegraph_text(profiling.slow_request_collapsed(request_id), f"slow-{request_id}.collapsed")
+
+
+base_app.include_router(admin)
+
+
+def _warm_analytics():
+    """Build the analytics feature cache off the startup path (reads every .md once)."""
+    from tools.analytics import warm_cache
+
+    try:
+        logger.info(f"Analytics cache warmed: {warm_cache()}")
+    except Exception as e:
+        logger.warning(f"Analytics cache warm-up failed: {e}")
+
+
+def create_app():
+    """Serve base_app, with AgentOS behind it built on first use (uvicorn app factory)."""
+    validate_api_keys()
+    # Prune old sessions and VACUUM chat_sessions.db periodically
+    start_background_maintenance()
+
+    if os.getenv("SERVE_FRONTEND") == "1" and os.path.isdir(_FRONTEND_DIST):
+        from fastapi.staticfiles import StaticFiles
+
+        # Mounted last, so every API route above still matches first
+        base_app.mount("/", StaticFiles(directory=_FRONTEND_DIST, html=True), name="frontend")
+
+    app = _AgentOSFallback(base_app)
+    if profiling.admin_token():
+        app = profiling.SlowRequestMiddleware(app)
+
+    if os.getenv("ANALYTICS_WARMUP", "1") != "0":
+        threading.Thread(target=_warm_analytics, name="analytics-warmup", daemon=True).start()
+
+    # Called inside uvicorn's serve loop, after it installed its own signal handlers
+    _install_drain_handlers()
+    return app
 
-app = agent_os.get_app()
 
 if __name__ == "__main__":
-    agent_os.serve(app="serve:app", port=7777, reload=True)
+    if "--profile-imports" in sys.argv:
+        from tools.import_profile import main as profile_imports
+
+        sys.exit(profile_imports())
+
+    parser = argparse.ArgumentParser(description="SEO Workspace backend")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Production mode with N worker processes (default: one auto-reloading dev server)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    validate_api_keys()
+    if args.workers:
+        os.environ["SERVE_FRONTEND"] = "1"  # Inherited by the worker processes
+        uvicorn.run(
+            "serve:create_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_graceful_shutdown=_drain_seconds(),
+        )
+    else:
+        uvicorn.run("serve:create_app", factory=True, host=args.host, port=args.port, reload=True)
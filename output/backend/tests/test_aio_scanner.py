@@ -0,0 +1,48 @@
+"""
+Regression cases for tools/aio.py's streamed SERP scanner.
+
+Run from output/backend:
+    python -m pytest tests
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("agno")
+
+from tools.aio import _SerpItemScanner
+
+
+def _scan(body: dict, chunk_size: int) -> tuple[list, bool]:
+    text = json.dumps(body)
+    scanner = _SerpItemScanner()
+    items = []
+    for i in range(0, len(text), chunk_size):
+        items.extend(scanner.feed(text[i:i + chunk_size]))
+    return items, scanner.finished
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_nested_items_before_serp_items_are_skipped(chunk_size):
+    # refinement_chips.items comes before result[0].items in real responses
+    body = {"tasks": [{
+        "data": {"keyword": 'quoted "items": [1] \\'},
+        "result": [{
+            "keyword": "seo",
+            "refinement_chips": {"type": "refinement_chips", "items": [{"type": "chip", "title": "tools"}]},
+            "items": [
+                {"type": "organic", "rank_absolute": 1},
+                {"type": "ai_overview", "items": [{"text": "AI text"}]},
+            ],
+        }],
+    }]}
+    items, finished = _scan(body, chunk_size)
+    assert [item["type"] for item in items] == ["organic", "ai_overview"]
+    assert finished
+
+
+def test_null_items():
+    items, finished = _scan({"tasks": [{"result": [{"items": None}]}]}, 1 << 20)
+    assert items == [] and finished
@@ -0,0 +1,36 @@
+"""
+Per-article features in tools/analytics.py.
+
+Run from output/backend:
+    python -m pytest tests
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tools import analytics
+
+
+def test_keyword_counts_include_adjacent_repeats():
+    tokens = "seo seo seo tips seo tips".split()
+    assert analytics._keyword_counts(tokens, ["seo", "seo tips", "tips seo tips", "missing"]) == {
+        "seo": 4, "seo tips": 2, "tips seo tips": 1, "missing": 0,
+    }
+
+
+def test_minhash_signature_is_stable_across_processes():
+    tokens = "how to choose running shoes for trail running in winter".split()
+    code = (
+        "import sys; from tools.analytics import _minhash; "
+        "print(','.join(map(str, _minhash(sys.argv[1:]))))"
+    )
+    runs = {
+        subprocess.run([sys.executable, "-c", code, *tokens], capture_output=True, text=True, check=True).stdout
+        for _ in range(2)
+    }
+    assert len(runs) == 1
+    assert runs.pop().strip() == ",".join(map(str, analytics._minhash(tokens)))
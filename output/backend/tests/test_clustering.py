@@ -0,0 +1,31 @@
+"""
+Batch planning (tools/clustering.py) without stored research.
+
+Run from output/backend:
+    python -m pytest tests
+"""
+
+import pytest
+
+from tools import clustering
+
+
+@pytest.fixture
+def no_research(monkeypatch):
+    monkeypatch.setattr(clustering, "stored_urls", lambda topic: set())
+
+
+def test_merged_keywords_are_normalized_and_deduplicated(no_research):
+    clusters = clustering.cluster_topics(["SEO tips for beginners", "Beginners' SEO tips!", "seo  TIP for beginner"])
+    assert len(clusters) == 1
+    assert clusters[0]["keywords"] == "beginners seo tips"  # primary (shortest) first, variants dropped
+    assert len(clusters[0]["topics"]) == 3
+
+
+def test_lexically_related_clusters_chain_without_research(no_research):
+    clusters = clustering.cluster_topics(["on-page SEO audit", "Sourdough starter recipe", "technical SEO audit tools"])
+    by_topic = {c["primary_topic"]: c for c in clusters}
+    assert len(clusters) == 3
+    assert [c["primary_topic"] for c in clusters][:2] == ["on-page SEO audit", "technical SEO audit tools"]
+    assert by_topic["technical SEO audit tools"]["related_to_previous"] is True
+    assert by_topic["Sourdough starter recipe"]["related_to_previous"] is False
@@ -0,0 +1,129 @@
+"""
+History compaction (tools/history.py) on sessions stored by Agno itself.
+
+Run from output/backend:
+    python -m pytest tests
+"""
+
+import json
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip("agno")
+pytest.importorskip("sqlalchemy")
+
+from agno.models.message import Message
+from agno.run.base import RunStatus
+from agno.run.team import TeamRunOutput
+from agno.session import TeamSession
+
+from tools import history, sessions
+
+
+ARTICLE = "# Best running shoes\n\n" + "\n\n".join(
+    f"## Section {i}\n\n" + "Cushioning and fit matter most. " * 40 for i in range(5)
+)
+AIO_BLOCK = "```aio-result\n" + json.dumps({
+    "keyword": "running shoes",
+    "has_aio": True,
+    "content": "AI Overview text. " * 100,
+    "references": [{"source": "example.com", "title": "Guide", "url": "https://example.com"}],
+}) + "\n```"
+
+
+def _run(session_id: str, i: int) -> TeamRunOutput:
+    """A leader run: question, a save_article tool call with the full article, and an AIO answer."""
+    return TeamRunOutput(
+        run_id=f"{session_id}-run-{i}",
+        team_id="seo-team",
+        session_id=session_id,
+        content=f"Saved article run-{i}.\n\n{AIO_BLOCK}",
+        status=RunStatus.completed,
+        messages=[
+            Message(role="system", content="You are the team leader."),
+            Message(role="user", content=f"Write article {i} and check its AI Overview"),
+            Message(role="assistant", content="", tool_calls=[{
+                "id": f"call-{i}",
+                "type": "function",
+                "function": {"name": "save_article", "arguments": json.dumps(
+                    {"topic": f"Article {i}", "article_markdown": ARTICLE, "keywords": "running shoes"}
+                )},
+            }]),
+            Message(role="tool", tool_call_id=f"call-{i}", content=json.dumps(
+                {"article_id": f"best-running-shoes-{i}", "word_count": 1000}
+            )),
+            Message(role="assistant", content=f"Saved article best-running-shoes-{i}.\n\n{AIO_BLOCK}"),
+        ],
+    )
+
+
+@pytest.fixture
+def session_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "DB_FILE", str(tmp_path / "chat_sessions.db"))
+    db = sessions.build_session_db()
+    session = TeamSession(session_id="s1", team_id="seo-team", created_at=int(time.time()))
+    session.runs = [_run("s1", i) for i in range(3)]
+    db.upsert_session(session)
+    for i, run in enumerate(session.runs):
+        db.upsert_run(run, session_id="s1", run_index=i)
+    return db
+
+
+def _history(db) -> list:
+    session = db.get_session(session_id="s1", session_type=None)
+    return [m.model_copy(update={"from_history": True}) for m in session.get_messages(skip_roles=["system"])]
+
+
+def test_compacts_all_but_the_latest_runs(session_db):
+    messages = _history(session_db) + [Message(role="user", content="Now add images to it")]
+    compacted = history.compact_history(messages, keep_raw=1)
+
+    assert len(compacted) == len(messages)
+    older, latest = compacted[:8], compacted[8:]
+    text = json.dumps([m.to_dict() for m in older])
+    assert "Cushioning and fit" not in text and "AI Overview text" not in text
+    arguments = json.loads(older[1].tool_calls[0]["function"]["arguments"])
+    assert arguments["article_markdown"].startswith('[article omitted: "Best running shoes"')
+    assert arguments["topic"] == "Article 0"
+    assert older[3].content.endswith('[aio-result omitted: keyword="running shoes", has_aio=true, references=1]')
+    assert "best-running-shoes-0" in text  # IDs the leader resolves "that article" with
+    # The latest history run and the new user message go out unchanged
+    assert latest == messages[8:]
+    # Copies only -- the messages passed in keep their content
+    assert "AI Overview text" in messages[3].content
+
+
+def test_report_reads_through_agno_and_writes_nothing(session_db):
+    conn = sqlite3.connect(sessions.DB_FILE)
+    before = conn.execute("SELECT run_id, run_data FROM agno_runs ORDER BY run_index").fetchall()
+
+    report = history.history_report("s1", db=session_db)
+
+    assert report["runs"] == 3
+    assert report["replayed_runs"] == 3
+    assert report["replayed_compacted_chars"] < report["replayed_raw_chars"] / 2
+    assert report["replayed_compacted_tokens_est"] < report["replayed_raw_tokens_est"]
+    assert report["load_ms"] >= 0 and report["compact_ms"] >= 0
+    assert "best-running-shoes-0" in report["references"]["article_ids"]
+    assert conn.execute("SELECT run_id, run_data FROM agno_runs ORDER BY run_index").fetchall() == before
+    conn.close()
+
+    assert history.history_report("missing", db=session_db) == {"error": "Session missing not found."}
+
+
+def test_leader_model_sends_compacted_history(session_db, monkeypatch):
+    pytest.importorskip("anthropic")
+    from agno.models.anthropic import Claude
+
+    from agents.team import HistoryCompactingClaude
+
+    sent = []
+    monkeypatch.setattr(Claude, "invoke", lambda self, messages, **kwargs: sent.append(messages))
+    messages = _history(session_db) + [Message(role="user", content="Now add images to it")]
+
+    HistoryCompactingClaude(id="claude-sonnet-4-5-20250929").invoke(messages=messages, assistant_message=Message(role="assistant"))
+
+    assert "AI Overview text" not in json.dumps([m.to_dict() for m in sent[0][:8]])
+    assert sent[0][8:] == messages[8:]
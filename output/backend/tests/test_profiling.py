@@ -0,0 +1,50 @@
+"""
+Tool-call timelines (tools/profiling.py record_tool_call).
+
+Run from output/backend:
+    python -m pytest tests
+"""
+
+import asyncio
+import inspect
+import time
+
+from tools import profiling
+
+
+def _record() -> dict:
+    return {"_start": time.perf_counter(), "tool_calls": []}
+
+
+def test_hook_is_sync_and_only_attached_with_admin_token(monkeypatch):
+    # agno runs sync tools in a thread only when no tool hook is a coroutine function
+    assert not inspect.iscoroutinefunction(profiling.record_tool_call)
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert profiling.tool_hooks() is None
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert profiling.tool_hooks() == [profiling.record_tool_call]
+
+
+def test_times_sync_and_async_tools():
+    record = _record()
+    token = profiling._current_request.set(record)
+    try:
+        assert profiling.record_tool_call("add", lambda a, b: a + b, {"a": 1, "b": 2}) == 3
+
+        async def slow_tool(delay):
+            await asyncio.sleep(delay)
+            return "done"
+
+        result = profiling.record_tool_call("slow_tool", slow_tool, {"delay": 0.05})
+        assert inspect.isawaitable(result)
+        assert asyncio.run(result) == "done"
+    finally:
+        profiling._current_request.reset(token)
+
+    add, slow = record["tool_calls"]
+    assert (add["tool"], add["error"]) == ("add", None)
+    assert slow["tool"] == "slow_tool" and slow["duration_ms"] >= 50
+
+
+def test_no_request_passes_through():
+    assert profiling.record_tool_call("add", lambda a, b: a + b, {"a": 1, "b": 2}) == 3
@@ -0,0 +1,65 @@
+"""
+Revision log rebuilds (tools/revisions.py), including logs with torn entries.
+
+Run from output/backend:
+    python -m pytest tests
+"""
+
+import json
+
+import pytest
+
+from tools import revisions
+
+
+ARTICLE = "# Trail running\n\n" + "".join(f"Paragraph {i} about grip and cushioning.\n" for i in range(200))
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    path = tmp_path / "article.jsonl"
+    monkeypatch.setattr(revisions, "_log_path", lambda article_id, layout=None: str(path))
+    return path
+
+
+def _write(log, versions):
+    previous = None
+    for i, text in enumerate(versions):
+        revisions.record_revision("article", previous, text, f"2026-01-0{i + 1}", len(text.split()))
+        previous = text
+
+
+def _entries(log) -> list[dict]:
+    return [json.loads(line) for line in log.read_text().splitlines()]
+
+
+def test_small_edits_are_deltas_and_rebuild(log):
+    versions = [ARTICLE, ARTICLE + "One more line.\n", ARTICLE.replace("Paragraph 5 ", "Para 5 ")]
+    _write(log, versions)
+
+    assert [e["kind"] for e in _entries(log)] == ["full", "delta", "delta"]
+    for rev, text in enumerate(versions, start=1):
+        assert revisions.get_revision("article", rev) == text
+
+
+def test_short_article_stored_full_when_delta_is_not_smaller(log):
+    _write(log, ["# Hi\n\nShort.\n", "# Hi\n\nShorter still.\n"])
+    assert [e["kind"] for e in _entries(log)] == ["full", "full"]
+
+
+def test_missing_base_raises_instead_of_wrapping(log):
+    versions = [ARTICLE, ARTICLE + "a\n", ARTICLE + "a\nb\n", ARTICLE + "a\nb\nc\n"]
+    _write(log, versions)
+    # Drop rev 2 (a skipped torn line): rev 3's delta must not be applied to rev 1
+    log.write_text("".join(json.dumps(e) + "\n" for e in _entries(log) if e["rev"] != 2))
+
+    assert revisions.get_revision("article", 1) == versions[0]
+    with pytest.raises(ValueError, match="revision 2"):
+        revisions.get_revision("article", 3)
+    assert "revision 2" in json.loads(revisions.restore_revision("article", 4))["error"]
+    assert revisions.storage_stats("article")["unreadable"] == 2
+
+    # No full snapshot at all: clear error, not a lookup at entries[-1]
+    log.write_text("".join(json.dumps(e) + "\n" for e in _entries(log) if e["kind"] != "full"))
+    with pytest.raises(ValueError):
+        revisions.get_revision("article", 3)
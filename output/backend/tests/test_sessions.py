@@ -0,0 +1,97 @@
+"""
+Session store upkeep (tools/sessions.py) against a DB written by Agno itself.
+
+Run from output/backend:
+    python -m pytest tests
+"""
+
+import json
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip("agno")
+pytest.importorskip("sqlalchemy")
+
+from agno.models.message import Message
+from agno.run.agent import RunOutput
+from agno.run.base import RunStatus
+from agno.run.team import TeamRunOutput
+from agno.session import TeamSession
+
+from tools import sessions
+
+
+def _write_session(db, session_id: str, runs: int, member_chars: int):
+    """Store a team session the way the team does: session row, then one row per run."""
+    session = TeamSession(session_id=session_id, team_id="seo-team", created_at=int(time.time()))
+    session.runs = [
+        TeamRunOutput(
+            run_id=f"{session_id}-run-{i}",
+            team_id="seo-team",
+            session_id=session_id,
+            content=f"Answer {i}",
+            status=RunStatus.completed,
+            messages=[Message(role="user", content=f"Question {i}"), Message(role="assistant", content=f"Answer {i}")],
+            member_responses=[RunOutput(
+                run_id=f"{session_id}-member-{i}",
+                agent_id="content-writer",
+                content="w" * member_chars,
+                status=RunStatus.completed,
+                messages=[Message(role="user", content="brief " * 500)],
+            )],
+        )
+        for i in range(runs)
+    ]
+    db.upsert_session(session)
+    for i, run in enumerate(session.runs):
+        db.upsert_run(run, session_id=session_id, run_index=i)
+
+
+@pytest.fixture
+def session_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "DB_FILE", str(tmp_path / "chat_sessions.db"))
+    return sessions.build_session_db()
+
+
+def test_trims_member_responses_in_runs_table(session_db):
+    _write_session(session_db, "s1", runs=2, member_chars=30000)
+
+    result = sessions.prune_sessions(retention_days=0, max_member_chars=20000)
+    assert result == {"deleted": 0, "trimmed": 2}
+
+    conn = sqlite3.connect(sessions.DB_FILE)
+    for (raw,) in conn.execute("SELECT run_data FROM agno_runs"):
+        member = json.loads(raw)["member_responses"][0]
+        assert member["messages"] is None
+        assert member["content"].endswith("[truncated]")
+    conn.close()
+
+    # Agno still loads the trimmed session, and a second pass has nothing to do
+    loaded = session_db.get_session("s1", session_type=None)
+    assert [run.content for run in loaded.runs] == ["Answer 0", "Answer 1"]
+    assert sessions.prune_sessions(retention_days=0, max_member_chars=20000)["trimmed"] == 0
+
+
+def test_retention_deletes_sessions_with_their_runs(session_db):
+    _write_session(session_db, "old", runs=2, member_chars=10)
+    _write_session(session_db, "new", runs=1, member_chars=10)
+    conn = sqlite3.connect(sessions.DB_FILE)
+    conn.execute("UPDATE agno_sessions SET created_at = 0, updated_at = 0 WHERE session_id = 'old'")
+    conn.commit()
+
+    assert sessions.prune_sessions(retention_days=30, max_member_chars=0)["deleted"] == 1
+    assert conn.execute("SELECT DISTINCT session_id FROM agno_runs").fetchall() == [("new",)]
+    conn.close()
+
+
+def test_report_sizes_sessions_from_runs_table(session_db):
+    _write_session(session_db, "s1", runs=3, member_chars=1000)
+
+    report = sessions.session_store_report()
+    assert report["sessions"] == 1
+    assert report["runs"] == 3
+    assert report["largest_sessions"][0]["session_id"] == "s1"
+    assert report["largest_sessions"][0]["runs_bytes"] > 3000
+    assert "idx_sessions_session_id" not in report["indexes"]
@@ -16,6 +16,8 @@ import httpx
 from agno.tools import Toolkit
 from agno.utils.log import logger
 
+from tools.gap_analysis import analyze_gaps
+
 
 def get_dataforseo_credentials() -> tuple[str, str] | None:
     """Decode DATA_FOR_SEO_API_KEY into a (login, password) tuple.
@@ -43,6 +45,150 @@ def get_dataforseo_credentials() -> tuple[str, str] | None:
     return (login, password)
 
 
+class _SerpItemScanner:
+    """Incrementally pulls top-level SERP items out of a streamed response body.
+
+    DataForSEO responses nest the organic results under
+    tasks[0].result[0].items. Rather than decoding the whole body, the scanner
+    walks the JSON structure up to that array and then decodes one item at a
+    time as text arrives, so the caller can stop reading as soon as it has
+    what it needs. Only the "items" member of a result object counts; nested
+    arrays with the same key (e.g. refinement_chips.items) are passed over.
+    """
+
+    _decoder = json.JSONDecoder()
+    # Containers enclosing the items array: (opening bracket, key it was opened under)
+    _ITEMS_PATH = [("{", None), ("[", "tasks"), ("{", None), ("[", "result"), ("{", None)]
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0           # Next unread offset in buffer
+        self.in_items = False
+        self.finished = False  # Reached the end of the items array (or it was null)
+        # Structure walk state, kept across chunks until the items array is found
+        self._stack = []       # Open containers as (bracket, key)
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string = None
+        self._key = None       # Key whose value comes next (set at ":")
+        self._at_items = False  # Just passed the "items": key
+
+    def feed(self, text: str):
+        """Add a chunk of body text and yield every item completed so far."""
+        self.buffer += text
+        if not self.in_items and not self._find_items_array():
+            return
+        while not self.finished:
+            item = self._next_item()
+            if item is None:
+                break
+            yield item
+
+        # Drop consumed text so memory stays bounded by one item
+        if self.in_items and self.pos > 65536:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+    def _find_items_array(self) -> bool:
+        """Walk the body up to tasks[0].result[0].items. True once inside it."""
+        buf = self.buffer
+        pos = self.pos
+        while pos < len(buf):
+            ch = buf[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = buf[self._string_start:pos]
+            elif self._at_items and not ch.isspace():
+                if ch != "[":
+                    self.finished = True  # "items": null
+                self.in_items = True
+                self.pos = pos + 1
+                return True
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = pos + 1
+            elif ch == ":":
+                self._key = self._last_string
+                self._at_items = self._key == "items" and self._stack == self._ITEMS_PATH
+            elif ch in "{[":
+                self._stack.append((ch, self._key))
+                self._key = None
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                self._key = None
+            elif ch == ",":
+                self._key = None
+            pos += 1
+        self.pos = pos
+        return False
+
+    def _next_item(self):
+        buf = self.buffer
+        pos = self.pos
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+            pos += 1
+        if pos >= len(buf):
+            self.pos = pos
+            return None
+        if buf[pos] == "]":
+            self.finished = True
+            return None
+        try:
+            item, end = self._decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            self.pos = pos
+            return None  # Item not complete yet
+        self.pos = end
+        return item
+
+
+def _parse_aio_item(keyword: str, aio_item: dict, compact: bool) -> dict:
+    """Turn a raw ai_overview SERP item into the tool's output shape.
+
+    References are deduplicated by URL. Compact mode leaves out `sections`,
+    which repeats content_markdown split into paragraphs.
+    """
+    sections = []
+    references = []
+    seen_urls = set()
+
+    def add_refs(refs):
+        for ref in refs or []:
+            url = ref.get("url", "")
+            key = url or ref.get("title", "")
+            if key in seen_urls:
+                continue
+            seen_urls.add(key)
+            references.append({
+                "title": ref.get("title", ""),
+                "url": url,
+                "source": ref.get("source", ""),
+            })
+
+    for element in aio_item.get("items") or []:
+        if element.get("text"):
+            sections.append(element["text"].strip())
+        add_refs(element.get("references"))
+    add_refs(aio_item.get("references"))
+
+    result = {
+        "keyword": keyword,
+        "has_aio": True,
+        "content_markdown": "\n\n".join(sections),
+        "references": references,
+    }
+    if not compact:
+        result["sections"] = sections
+    return result
+
+
 class AIOTools(Toolkit):
     """Toolkit for retrieving Google AI Overviews via DataForSEO."""
 
@@ -51,7 +197,7 @@ class AIOTools(Toolkit):
         super().__init__(name="aio_tools", tools=[self.get_ai_overview])
 
     def get_ai_overview(self, keyword: str, location_code: int = 2840,
-                        language_code: str = "en") -> str:
+                        language_code: str = "en", compact: bool = True) -> str:
         """Get Google's AI Overview for a keyword.
 
         Queries the DataForSEO SERP API with AI Overview loading enabled.
@@ -61,12 +207,18 @@ class AIOTools(Toolkit):
             keyword: The search term to check.
             location_code: DataForSEO location code (default 2840 = United States).
             language_code: Language code (default "en").
+            compact: Leave out the per-paragraph `sections` list (default True).
 
         Returns:
             JSON string with keyword, has_aio, and (if present) content and references.
         """
         try:
-            response = httpx.post(
+            scanner = _SerpItemScanner()
+            aio_item = None
+
+            # Stream the body and stop reading at the ai_overview item
+            with httpx.stream(
+                "POST",
                 "https://api.dataforseo.com/v3/serp/google/organic/live/advanced",
                 auth=self.auth,
                 json=[{
@@ -76,49 +228,20 @@ class AIOTools(Toolkit):
                     "load_async_ai_overview": True,
                 }],
                 timeout=60,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            tasks = data.get("tasks", [])
-            if not tasks or not tasks[0].get("result"):
-                return json.dumps({"keyword": keyword, "has_aio": False})
-
-            items = tasks[0]["result"][0].get("items", [])
-
-            # Find the AI Overview item
-            aio_item = None
-            for item in items:
-                if item.get("type") == "ai_overview":
-                    aio_item = item
-                    break
+            ) as response:
+                response.raise_for_status()
+                for chunk in response.iter_text():
+                    for item in scanner.feed(chunk):
+                        if item.get("type") == "ai_overview":
+                            aio_item = item
+                            break
+                    if aio_item or scanner.finished:
+                        break
 
             if not aio_item:
                 return json.dumps({"keyword": keyword, "has_aio": False})
 
-            # Extract content and references from the AI Overview
-            sections = []
-            references = []
-
-            for element in aio_item.get("items") or []:
-                if element.get("text"):
-                    sections.append(element["text"])
-                for ref in element.get("references") or []:
-                    references.append({
-                        "title": ref.get("title", ""),
-                        "url": ref.get("url", ""),
-                        "source": ref.get("source", ""),
-                    })
-
-            content_markdown = "\n\n".join(sections) if sections else ""
-
-            return json.dumps({
-                "keyword": keyword,
-                "has_aio": True,
-                "content_markdown": content_markdown,
-                "sections": sections,
-                "references": references,
-            })
+            return json.dumps(_parse_aio_item(keyword, aio_item, compact))
 
         except Exception as e:
             logger.warning(f"DataForSEO AIO check failed for '{keyword}': {e}")
@@ -130,7 +253,7 @@ class AIOTools(Toolkit):
 # ============================================================
 
 
-def get_ai_overview(keyword, location_code=2840, language_code="en"):
+def get_ai_overview(keyword, location_code=2840, language_code="en", compact=True):
     """Get Google's AI Overview for a keyword (standalone function).
 
     Returns a parsed dict (not JSON string). Returns None if DataForSEO
@@ -142,7 +265,7 @@ def get_ai_overview(keyword, location_code=2840, language_code="en"):
         return None
 
     toolkit = AIOTools(login=creds[0], password=creds[1])
-    result_json = toolkit.get_ai_overview(keyword, location_code, language_code)
+    result_json = toolkit.get_ai_overview(keyword, location_code, language_code, compact)
     return json.loads(result_json)
 
 
@@ -174,14 +297,15 @@ def optimize_for_aio(article_id: str) -> str:
     """Compare an article against current AI Overviews for its keywords.
 
     Fetches fresh AIO data for each of the article's target keywords and
-    returns a comparison showing what the AI Overview covers vs what the
-    article covers, plus content gaps and cited sources.
+    runs a local gap analysis against the article: an overall coverage
+    score, the AIO concepts the article is missing (ranked), and the AIO
+    sentences it covers least, each with the closest article section.
 
     Args:
         article_id: The article ID to optimize.
 
     Returns:
-        JSON with per-keyword AIO comparison data and the article's markdown.
+        JSON with the article's sections and per-keyword gap analysis and cited sources.
     """
     from tools.storage import get_article
 
@@ -201,6 +325,7 @@ def optimize_for_aio(article_id: str) -> str:
     if not keywords:
         return json.dumps({"error": "Article has no target keywords to analyze."})
 
+    markdown = article.get("article_markdown", "")
     comparisons = []
     for kw in keywords:
         aio_data = get_ai_overview(kw)
@@ -211,17 +336,19 @@ def optimize_for_aio(article_id: str) -> str:
             })
             continue
 
-        comparisons.append({
+        comparison = {
             "keyword": kw,
             "has_aio": aio_data.get("has_aio", False),
-            "aio_content": aio_data.get("content_markdown", ""),
             "aio_references": aio_data.get("references", []),
-            "article_has_content": bool(article.get("article_markdown")),
+            "article_has_content": bool(markdown),
             "article_word_count": article.get("word_count"),
-        })
+        }
+        # Precomputed diff instead of the raw AIO text
+        if comparison["has_aio"]:
+            comparison.update(analyze_gaps(aio_data.get("content_markdown", ""), markdown))
+        comparisons.append(comparison)
 
     # Extract section headings -- agent doesn't need the full article to analyze gaps
-    markdown = article.get("article_markdown", "")
     headings = [line.strip()[3:].strip() for line in markdown.split("\n") if line.strip().startswith("## ")]
 
     return json.dumps({
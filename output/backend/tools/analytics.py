@@ -0,0 +1,401 @@
+"""
+Catalog analytics -- whole-catalog stats over content/*.md using NumPy.
+
+Reports:
+  - summary          -- article count, word count / density / heading distributions
+  - duplicates       -- near-duplicate article pairs (MinHash + LSH, verified by cosine)
+  - cannibalization  -- articles competing for the same or overlapping target keywords
+                        (whole catalog, or only collisions with given keywords)
+  - headings         -- articles with structural problems (no H1, several H1s, few H2s, H3 before H2)
+
+Per-article features (shingle MinHash signature, word and heading counts,
+keyword density) are cached by (article ID, updated_at), so after the first
+run only new or edited articles are re-read from disk. serve.py warms the
+cache in a background thread at startup (warm_cache). Shingles are hashed
+with blake2b, so signatures are the same in every worker and after restarts.
+Cannibalization only needs metadata keywords, so it never reads .md files;
+keyword_collisions is the same check for a few given keywords (plan_batch
+and lookup_research attach it, so writers rarely need a separate call).
+
+Used by serve.py (/api/analytics routes) and the Content Writer (analyze_catalog tool).
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from tools.storage import _load_metadata, _load_records, _md_path
+
+
+_NUM_PERM = 64                 # MinHash signature length
+_BANDS, _ROWS = 16, 4          # LSH banding (_BANDS * _ROWS == _NUM_PERM)
+_SHINGLE = 3                   # Words per shingle
+
+_rng = np.random.default_rng(7)
+# Multiply-shift hash family: h(x) = (a * x + b) >> 32 with odd a, mod 2^64
+_PERM_A = _rng.integers(1, 1 << 62, size=_NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 62, size=_NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_cache: dict[str, tuple] = {}  # article_id -> (updated_at, features)
+_cache_lock = threading.Lock()
+_keywords_cache = None         # (records dict it was built from, {id: normalized keywords})
+
+
+# ============================================================
+# Per-article features
+# ============================================================
+
+
+def _normalize_keyword(keyword: str) -> str:
+    return " ".join(_WORD.findall(keyword.lower()))
+
+
+@lru_cache(maxsize=1 << 17)
+def _token_hash(token: str) -> int:
+    """64-bit token hash, stable across processes (builtin hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+
+
+def _minhash(tokens: list[str]) -> np.ndarray:
+    """MinHash signature of an article's word shingles."""
+    if len(tokens) < _SHINGLE:
+        tokens = tokens + [""] * (_SHINGLE - len(tokens))
+    # Hash each token once (the vocabulary repeats, so mostly from the LRU),
+    # then combine neighbours into shingles in NumPy
+    token_hashes = np.fromiter(map(_token_hash, tokens), dtype=np.uint64, count=len(tokens))
+    n = len(tokens) - _SHINGLE + 1
+    shingles = token_hashes[:n].copy()
+    for offset in range(1, _SHINGLE):
+        shingles = shingles * np.uint64(0x9E3779B97F4A7C15) + token_hashes[offset:n + offset]
+    shingles = np.unique(shingles)
+    # Every permutation at once, min over shingles (uint64 arithmetic wraps)
+    hashed = (np.outer(_PERM_A, shingles) + _PERM_B[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1)
+
+
+def _headings(markdown: str) -> dict:
+    h1 = h2 = h3 = 0
+    h3_before_h2 = False
+    for line in markdown.split("\n"):
+        if line.startswith("# "):
+            h1 += 1
+        elif line.startswith("## "):
+            h2 += 1
+        elif line.startswith("### "):
+            h3 += 1
+            if not h2:
+                h3_before_h2 = True
+    return {"h1": h1, "h2": h2, "h3": h3, "h3_before_h2": h3_before_h2}
+
+
+def _read(article_id: str) -> str:
+    try:
+        with open(_md_path(article_id), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def _keyword_counts(tokens: list[str], keywords: list[str]) -> dict[str, int]:
+    """Occurrences of each keyword as a run of tokens (every window, so repeats all count)."""
+    grams = {}
+    counts = {}
+    for kw in keywords:
+        words = tuple(kw.split())
+        n = len(words)
+        if n not in grams:
+            grams[n] = Counter(zip(*(tokens[i:] for i in range(n))))
+        counts[kw] = grams[n][words]
+    return counts
+
+
+def _features(article_id: str, entry: dict) -> dict:
+    """Read one article and compute everything the reports need.
+
+    Term counts are not kept -- cosine is only computed for the few reported
+    pairs, by re-reading those files.
+    """
+    markdown = _read(article_id)
+    tokens = _WORD.findall(markdown.lower())
+    keywords = [k for k in (_normalize_keyword(k) for k in entry.get("keywords", [])) if k]
+    counts = _keyword_counts(tokens, keywords)
+    density = {
+        kw: round(100 * counts[kw] * len(kw.split()) / len(tokens), 2) if tokens else 0.0
+        for kw in keywords
+    }
+    return {
+        "signature": _minhash(tokens),
+        "words": len(tokens),
+        "headings": _headings(markdown),
+        "keywords": keywords,
+        "density": density,
+    }
+
+
+def _catalog() -> tuple[list[str], dict, dict]:
+    """Article IDs, metadata, and (cached) features for the whole catalog."""
+    metadata = _load_metadata()
+    ids = list(metadata)
+    features = {}
+    with _cache_lock:
+        for article_id in ids:
+            stamp = metadata[article_id].get("updated_at")
+            cached = _cache.get(article_id)
+            if cached is None or cached[0] != stamp:
+                cached = (stamp, _features(article_id, metadata[article_id]))
+                _cache[article_id] = cached
+            features[article_id] = cached[1]
+        for stale in set(_cache) - set(metadata):
+            del _cache[stale]
+    return ids, metadata, features
+
+
+def _cosine(a_id: str, b_id: str) -> float:
+    """Cosine similarity of two articles' term-frequency vectors."""
+    a = Counter(_WORD.findall(_read(a_id).lower()))
+    b = Counter(_WORD.findall(_read(b_id).lower()))
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(count * b.get(term, 0) for term, count in a.items())
+    norm = np.sqrt(sum(v * v for v in a.values()) * sum(v * v for v in b.values()))
+    return float(dot / norm) if norm else 0.0
+
+
+# ============================================================
+# Reports
+# ============================================================
+
+
+def summary_report() -> dict:
+    """Catalog-wide distributions."""
+    ids, metadata, features = _catalog()
+    if not ids:
+        return {"articles": 0}
+
+    words = np.array([features[i]["words"] for i in ids])
+    h2 = np.array([features[i]["headings"]["h2"] for i in ids])
+    densities = np.array([d for i in ids for d in features[i]["density"].values()] or [0.0])
+    statuses = Counter(metadata[i].get("status", "review") for i in ids)
+
+    def dist(values: np.ndarray) -> dict:
+        p50, p90 = np.percentile(values, [50, 90])
+        return {
+            "mean": round(float(values.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p90": round(float(p90), 2),
+            "min": round(float(values.min()), 2),
+            "max": round(float(values.max()), 2),
+        }
+
+    return {
+        "articles": len(ids),
+        "statuses": dict(statuses),
+        "total_words": int(words.sum()),
+        "word_count": dist(words),
+        "h2_count": dist(h2),
+        "keyword_density_pct": dist(densities),
+        "over_optimized": int((densities > 3.0).sum()),
+        "articles_without_keywords": sum(1 for i in ids if not features[i]["keywords"]),
+    }
+
+
+def duplicates_report(threshold: float = 0.8, limit: int = 50) -> dict:
+    """Near-duplicate pairs: LSH candidates from MinHash, scored by estimated Jaccard and cosine."""
+    ids, metadata, features = _catalog()
+    if len(ids) < 2:
+        return {"threshold": threshold, "pairs": []}
+
+    signatures = np.vstack([features[i]["signature"] for i in ids])
+
+    # Band the signatures; articles sharing any band bucket are candidates
+    candidates = set()
+    for band in range(_BANDS):
+        rows = np.ascontiguousarray(signatures[:, band * _ROWS:(band + 1) * _ROWS])
+        buckets = defaultdict(list)
+        for index, key in enumerate(rows.view(f"V{rows.itemsize * _ROWS}").ravel()):
+            buckets[key.tobytes()].append(index)
+        for members in buckets.values():
+            if 1 < len(members) <= 200:
+                candidates.update(
+                    (members[x], members[y])
+                    for x in range(len(members)) for y in range(x + 1, len(members))
+                )
+
+    if not candidates:
+        return {"threshold": threshold, "pairs": []}
+
+    pairs = np.array(sorted(candidates))
+    jaccard = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    results = []
+    for (a, b), score in zip(pairs, jaccard):
+        if score < threshold:
+            continue
+        results.append({
+            "a": ids[a],
+            "b": ids[b],
+            "a_topic": metadata[ids[a]].get("topic", ""),
+            "b_topic": metadata[ids[b]].get("topic", ""),
+            "jaccard": round(float(score), 3),
+        })
+    results.sort(key=lambda r: -r["jaccard"])
+    results = results[:limit]
+    for r in results:
+        r["cosine"] = round(_cosine(r["a"], r["b"]), 3)
+    return {"threshold": threshold, "pairs": results}
+
+
+def _article_keywords() -> tuple[dict, dict[str, list[str]]]:
+    """The records, and normalized target keywords per article (articles without any left out).
+
+    Cached until the records change.
+    """
+    global _keywords_cache
+    records = _load_records()
+    cached = _keywords_cache
+    if cached is not None and cached[0] is records:
+        return cached
+    article_keywords = {
+        article_id: kws
+        for article_id, record in records.items()
+        if (kws := [k for k in (_normalize_keyword(k) for k in record.keywords) if k])
+    }
+    _keywords_cache = (records, article_keywords)
+    return _keywords_cache
+
+
+def keyword_collisions(keywords: list[str], min_overlap: float = 0.5, limit: int = 50) -> dict:
+    """Existing articles that target any of `keywords`, or an overlapping keyword set."""
+    records, article_keywords = _article_keywords()
+    wanted = [k for k in (_normalize_keyword(k) for k in keywords) if k]
+    wanted_tokens = set(" ".join(wanted).split())
+
+    same, overlapping = [], []
+    for article_id, kws in article_keywords.items():
+        exact = sorted(set(kws) & set(wanted))
+        if exact:
+            same.append({"id": article_id, "topic": records[article_id].topic, "keywords": exact})
+            continue
+        tokens = set(" ".join(kws).split())
+        score = len(tokens & wanted_tokens) / len(tokens | wanted_tokens) if wanted_tokens else 0.0
+        if score >= min_overlap:
+            overlapping.append({"id": article_id, "topic": records[article_id].topic,
+                                "keyword_overlap": round(score, 2)})
+
+    overlapping.sort(key=lambda o: -o["keyword_overlap"])
+    return {"keywords": wanted, "same_keywords": same[:limit], "overlapping_keyword_sets": overlapping[:limit]}
+
+
+def cannibalization_report(min_overlap: float = 0.5, limit: int = 50, keywords: list[str] = None) -> dict:
+    """Articles targeting the same keyword, or keyword sets with high token overlap.
+
+    With `keywords`, only reports existing articles that collide with those
+    keywords (the pre-write check) instead of every pair in the catalog.
+    """
+    if keywords is not None:
+        return keyword_collisions(keywords, min_overlap, limit)
+    _, article_keywords = _article_keywords()
+
+    by_keyword = defaultdict(list)
+    for article_id, kws in article_keywords.items():
+        for kw in kws:
+            by_keyword[kw].append(article_id)
+
+    shared = [
+        {"keyword": kw, "articles": sorted(set(members))}
+        for kw, members in by_keyword.items() if len(set(members)) > 1
+    ]
+    shared.sort(key=lambda s: -len(s["articles"]))
+
+    # Token-level overlap between keyword sets, candidates via an inverted index
+    token_sets = {i: set(" ".join(kws).split()) for i, kws in article_keywords.items()}
+    by_token = defaultdict(list)
+    for article_id, tokens in token_sets.items():
+        for token in tokens:
+            by_token[token].append(article_id)
+    overlaps = {}
+    for members in by_token.values():
+        if len(members) > 200:
+            continue  # Too generic to signal cannibalization
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in overlaps:
+                    continue
+                a, b = token_sets[pair[0]], token_sets[pair[1]]
+                overlaps[pair] = len(a & b) / len(a | b)
+
+    overlapping = [
+        {"a": a, "b": b, "keyword_overlap": round(score, 2)}
+        for (a, b), score in overlaps.items() if score >= min_overlap
+    ]
+    overlapping.sort(key=lambda o: -o["keyword_overlap"])
+    return {"shared_keywords": shared[:limit], "overlapping_keyword_sets": overlapping[:limit]}
+
+
+def headings_report(limit: int = 100) -> dict:
+    """Articles whose heading structure breaks the H1 / 5-8 H2 convention."""
+    ids, metadata, features = _catalog()
+    issues = []
+    for article_id in ids:
+        h = features[article_id]["headings"]
+        problems = []
+        if h["h1"] == 0:
+            problems.append("missing_h1")
+        elif h["h1"] > 1:
+            problems.append("multiple_h1")
+        if h["h2"] < 3:
+            problems.append("few_h2")
+        if h["h3_before_h2"]:
+            problems.append("h3_before_h2")
+        if problems:
+            issues.append({"id": article_id, "topic": metadata[article_id].get("topic", ""),
+                           "problems": problems, **{k: h[k] for k in ("h1", "h2", "h3")}})
+    return {"articles_with_issues": len(issues), "issues": issues[:limit]}
+
+
+_REPORTS = {
+    "summary": summary_report,
+    "duplicates": duplicates_report,
+    "cannibalization": cannibalization_report,
+    "headings": headings_report,
+}
+
+
+def warm_cache() -> dict:
+    """Compute features for every article now, so the first report doesn't have to."""
+    started = time.perf_counter()
+    ids, _, _ = _catalog()
+    return {"articles": len(ids), "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+# ============================================================
+# Agent-facing tool functions (return JSON strings)
+# ============================================================
+
+
+def analyze_catalog(report: str = "summary", keywords: str = "") -> str:
+    """Analyze the whole article catalog.
+
+    Args:
+        report: One of "summary", "duplicates", "cannibalization", or "headings".
+        keywords: Comma-separated target keywords (cannibalization only). When
+            given, only existing articles colliding with these keywords are returned.
+
+    Returns:
+        JSON report. Use "cannibalization" with your target keywords before
+        writing to check whether an existing article already targets them.
+    """
+    func = _REPORTS.get(report)
+    if func is None:
+        return json.dumps({"error": f"Unknown report '{report}'. Use one of: {', '.join(_REPORTS)}."})
+    if report == "cannibalization" and keywords.strip():
+        return json.dumps(func(keywords=[k for k in keywords.split(",") if k.strip()]))
+    return json.dumps(func())
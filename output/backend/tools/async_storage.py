@@ -0,0 +1,60 @@
+"""
+Async storage facade -- non-blocking access to tools/storage.py for FastAPI routes.
+
+The storage layer does blocking file I/O and guards every read-modify-write
+with storage._lock, a FileLock (tools/filelock.py): a threading.Lock for the
+agents' tool-call threads plus an OS file lock on content/.lock for the other
+server workers and CLI tools. Calling it directly from an async route blocks
+the event loop (and every chat stream on it) whenever a disk read is slow or
+a batch save holds the lock.
+
+Every call here runs on a small dedicated thread pool instead, so the lock is
+only ever waited on by pool threads, never by the event loop. The pool is
+bounded (STORAGE_IO_THREADS, default 4) so a burst of requests queues up
+rather than spawning unbounded threads or starving FastAPI's own pool.
+
+There is deliberately no asyncio-aware lock. The writers that lock contends
+with are agent tool threads and other processes, which an asyncio.Lock can't
+exclude, so it would have to be taken alongside the FileLock anyway. Routes
+only ever wait on the FileLock from a pool thread, which keeps the loop just
+as free. tools/load_test.py measures /api/articles latency while saves are
+in flight.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from tools import storage
+
+
+def _pool_size() -> int:
+    try:
+        return max(1, int(os.getenv("STORAGE_IO_THREADS", "").strip() or 4))
+    except ValueError:
+        return 4
+
+
+_executor = ThreadPoolExecutor(max_workers=_pool_size(), thread_name_prefix="storage-io")
+
+
+async def run_io(func, *args, **kwargs):
+    """Run a blocking storage call on the storage I/O pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def listing_json(status: str = None) -> str:
+    """Async storage.listing_json."""
+    return await run_io(storage.listing_json, status)
+
+
+async def get_article(article_id: str) -> dict | None:
+    """Async storage.get_article."""
+    return await run_io(storage.get_article, article_id)
+
+
+async def delete_article(article_id: str) -> bool:
+    """Async storage.delete_article."""
+    return await run_io(storage.delete_article, article_id)
@@ -0,0 +1,207 @@
+"""
+Keyword clustering -- plans batch article generation before any writing starts.
+
+Batch requests ("Create 5 articles from these topics: ...") often contain
+overlapping topics. Writing one article per topic repeats the research and
+produces articles that cannibalize each other. plan_batch groups the topics
+first:
+
+  1. Similarity between two topics is the larger of
+       - word overlap (Jaccard over content words)
+       - character trigram overlap, only for near-identical spellings
+         (>= _NEAR_IDENTICAL, e.g. "backlink"/"backlinks", "e-commerce"/"ecommerce");
+         lower trigram scores are ignored, since "on-page SEO"/"off-page SEO"
+         already share half their trigrams
+       - SERP overlap (shared result URLs), when both were searched before (research.py)
+  2. Topics above the threshold are grouped (single-link), one article per group.
+  3. Each group gets a primary topic and merged target keywords for save_article:
+     each topic lowercased with punctuation stripped, word-order and plural
+     variants ("SEO tips"/"tip seo") kept once.
+  4. Groups are ordered so related groups are adjacent, and groups that already
+     have stored research come first. A group is marked related_to_previous
+     (and chained behind it) when there is research to reuse: the two groups'
+     stored SERP URLs overlap, or, before either has been searched, their
+     topics share enough content words (_RELATED_TOPICS) that the first one's
+     searches will serve the second. Everything else runs in parallel.
+"""
+
+import json
+import re
+
+from tools.research import cluster_key, stored_urls
+
+
+_NEAR_IDENTICAL = 0.8       # Trigram overlap that counts as the same topic spelled differently
+_SHARED_RESEARCH = 0.2      # SERP URL overlap at which a cluster waits for the previous one
+_RELATED_TOPICS = 0.3       # Content-word overlap that chains clusters when neither has stored research
+_KEYWORD_WORD = re.compile(r"[a-z0-9][a-z0-9+-]*(?:'[a-z]+)?")
+
+
+# ============================================================
+# Similarity
+# ============================================================
+
+
+def _trigrams(text: str) -> set[str]:
+    compact = re.sub(r"[^a-z0-9]+", "", text.lower())
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _split_topics(raw: str) -> list[str]:
+    """Split a topic list on newlines, semicolons, or pipes -- commas if none of those."""
+    parts = re.split(r"[\n;|]+", raw)
+    if len(parts) == 1:
+        parts = raw.split(",")
+    topics, seen = [], set()
+    for part in parts:
+        topic = re.sub(r"^\s*(?:\d+[.)]|[-*])\s*", "", part).strip()
+        if topic and topic.lower() not in seen:
+            seen.add(topic.lower())
+            topics.append(topic)
+    return topics
+
+
+def _merge_keywords(topics: list[str]) -> list[str]:
+    """Topics as target keywords: normalized, one per cluster key, in order."""
+    keywords, seen = [], set()
+    for topic in topics:
+        keyword = " ".join(_KEYWORD_WORD.findall(topic.lower()))
+        key = cluster_key(keyword) or keyword
+        if keyword and key not in seen:
+            seen.add(key)
+            keywords.append(keyword)
+    return keywords
+
+
+def similarity_matrix(topics: list[str], urls: list[set]) -> list[list[float]]:
+    """Pairwise topic similarity (0-1), computed once for the whole batch."""
+    words = [set(cluster_key(t).split()) for t in topics]
+    grams = [_trigrams(t) for t in topics]
+    n = len(topics)
+    matrix = [[1.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            spelling = _jaccard(grams[i], grams[j])
+            score = max(
+                _jaccard(words[i], words[j]),
+                spelling if spelling >= _NEAR_IDENTICAL else 0.0,
+                _jaccard(urls[i], urls[j]),
+            )
+            matrix[i][j] = matrix[j][i] = score
+    return matrix
+
+
+# ============================================================
+# Clustering and ordering
+# ============================================================
+
+
+def cluster_topics(topics: list[str], threshold: float = 0.5) -> list[dict]:
+    """Group topics and order the groups for writing.
+
+    Returns:
+        List of clusters, in suggested writing order, each with primary_topic,
+        topics, keywords (comma-separated, for save_article), has_research, and
+        related_to_previous.
+    """
+    if not topics:
+        return []
+    urls = [stored_urls(t) for t in topics]
+    words = [set(cluster_key(t).split()) for t in topics]
+    matrix = similarity_matrix(topics, urls)
+    n = len(topics)
+
+    # Union-find over pairs above the threshold
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            if matrix[i][j] >= threshold:
+                parent[find(i)] = find(j)
+
+    groups: dict[int, list[int]] = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+
+    clusters = []
+    for members in groups.values():
+        # Primary topic: the one most similar to the rest of its group (ties -> shortest)
+        primary = max(members, key=lambda i: (sum(matrix[i][j] for j in members), -len(topics[i])))
+        keywords = _merge_keywords([topics[primary]] + [topics[i] for i in members if i != primary])
+        clusters.append({
+            "members": members,
+            "urls": set().union(*(urls[i] for i in members)),
+            "words": set().union(*(words[i] for i in members)),
+            "primary_topic": topics[primary],
+            "topics": [topics[i] for i in members],
+            "keywords": ", ".join(keywords),
+            "has_research": any(urls[i] for i in members),
+        })
+
+    # Order: start from a group with research, then always move to the most related remaining group
+    def link(a: dict, b: dict) -> float:
+        return max(matrix[i][j] for i in a["members"] for j in b["members"])
+
+    remaining = sorted(clusters, key=lambda c: (not c["has_research"], c["members"][0]))
+    ordered = [remaining.pop(0)]
+    while remaining:
+        best = max(range(len(remaining)), key=lambda k: link(ordered[-1], remaining[k]))
+        ordered.append(remaining.pop(best))
+
+    # Chain only where the previous cluster's research covers (or, unsearched, will cover) this one
+    for position, cluster in enumerate(ordered):
+        previous = ordered[position - 1] if position > 0 else None
+        if previous is None:
+            related = False
+        elif previous["urls"] and cluster["urls"]:
+            related = _jaccard(previous["urls"], cluster["urls"]) >= _SHARED_RESEARCH
+        else:
+            related = _jaccard(previous["words"], cluster["words"]) >= _RELATED_TOPICS
+        cluster["related_to_previous"] = related
+    for cluster in ordered:
+        del cluster["members"], cluster["urls"], cluster["words"]
+    return ordered
+
+
+# ============================================================
+# Agent-facing tool functions (return JSON strings)
+# ============================================================
+
+
+def plan_batch(topics: str, threshold: float = 0.5) -> str:
+    """Group a batch of requested topics into one article per keyword cluster.
+
+    Call this before creating tasks for any batch of 2+ articles.
+
+    Args:
+        topics: The requested topics, one per line (or separated by ";").
+        threshold: Similarity (0-1) above which topics share an article (default 0.5).
+
+    Returns:
+        JSON with clusters in suggested writing order. Each has primary_topic,
+        the topics it covers, merged keywords to pass to save_article,
+        has_research, related_to_previous, and existing_articles (catalog
+        articles already targeting those keywords -- the pre-write check).
+    """
+    from tools.analytics import keyword_collisions  # NumPy is loaded when a batch is first planned
+
+    topic_list = _split_topics(topics)
+    clusters = cluster_topics(topic_list, threshold)
+    for cluster in clusters:
+        found = keyword_collisions(cluster["keywords"].split(","), limit=5)
+        cluster["existing_articles"] = found["same_keywords"] + found["overlapping_keyword_sets"]
+    return json.dumps({
+        "requested": len(topic_list),
+        "articles": len(clusters),
+        "clusters": clusters,
+    })
@@ -0,0 +1,148 @@
+"""
+Article change events -- pub/sub for storage writes, shared across workers.
+
+storage.py publishes a small event whenever an article is created, updated,
+or deleted. serve.py streams them to the browser over SSE
+(/api/articles/events), so the sidebar updates without polling.
+
+Events are delivered to this process's subscribers right away and appended
+to content/.events.jsonl. With several server workers (or a CLI import next
+to the server), each process tails that file every _POLL_SECONDS and
+delivers the other processes' events. A browser whose stream is on one
+worker then still sees an article saved by another. storage.py publishes
+while holding its cross-process _lock, so appends and rotation (to
+.events.jsonl.1 past _MAX_LOG_BYTES) never interleave. Tailers drain the
+rotated file through their open handle before switching (1MB is thousands of
+events, far more than arrive between two polls).
+
+Publishing is thread-safe: agent tools run in worker threads while
+subscribers are asyncio queues on the server's event loop.
+
+Event shape:
+  {"type": "created" | "updated" | "deleted", "id": "...", "article": {...summary...} | None}
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+
+_subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+_subscribers_lock = threading.Lock()
+
+# A slow client misses events rather than letting its queue grow without bound
+# (the frontend re-fetches the full list when its stream reconnects)
+_QUEUE_SIZE = 256
+
+_POLL_SECONDS = 0.5
+_MAX_LOG_BYTES = 1 << 20
+_tailer: threading.Thread | None = None
+
+
+def _log_file() -> str:
+    from tools.storage import _CONTENT_DIR  # storage imports this module
+
+    return os.path.join(_CONTENT_DIR, ".events.jsonl")
+
+
+def _deliver(event: dict):
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(_offer, queue, event)
+        except RuntimeError:
+            # Loop already closed -- the subscriber is gone
+            with _subscribers_lock:
+                _subscribers.discard((loop, queue))
+
+
+def publish(event_type: str, article_id: str, article: dict | None = None):
+    """Send an event to every subscriber, in every worker. Call with storage._lock held."""
+    event = {"type": event_type, "id": article_id, "article": article}
+    _deliver(event)
+    path = _log_file()
+    try:
+        if os.path.exists(path) and os.path.getsize(path) > _MAX_LOG_BYTES:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"pid": os.getpid(), **event}, ensure_ascii=False) + "\n")
+    except OSError:
+        pass  # Other workers miss this one; their streams resync on reconnect
+
+
+def _tail():
+    """Deliver events appended by other processes, from the moment tailing starts."""
+    path = _log_file()
+    me = os.getpid()
+    handle, inode, pending = None, None, b""
+
+    def drain():
+        nonlocal pending
+        pending += handle.read()
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if entry.pop("pid", None) != me:
+                _deliver(entry)
+
+    try:
+        handle = open(path, "rb")
+        handle.seek(0, os.SEEK_END)
+        inode = os.fstat(handle.fileno()).st_ino
+    except FileNotFoundError:
+        pass
+
+    while True:
+        time.sleep(_POLL_SECONDS)
+        try:
+            if handle is not None:
+                drain()
+            try:
+                current = os.stat(path).st_ino
+            except FileNotFoundError:
+                continue
+            if current != inode:
+                # Rotated (or created): finish the old file, then read the new one from its start
+                if handle is not None:
+                    drain()
+                    handle.close()
+                handle, inode, pending = open(path, "rb"), current, b""
+                drain()
+        except OSError:
+            continue
+
+
+def _ensure_tailer():
+    global _tailer
+    with _subscribers_lock:
+        if _tailer is None:
+            _tailer = threading.Thread(target=_tail, name="article-events-tail", daemon=True)
+            _tailer.start()
+
+
+def _offer(queue: asyncio.Queue, event: dict):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        pass
+
+
+def subscribe() -> asyncio.Queue:
+    """Register a queue on the running event loop. Pair with unsubscribe()."""
+    _ensure_tailer()
+    queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+    with _subscribers_lock:
+        _subscribers.add((asyncio.get_running_loop(), queue))
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue):
+    with _subscribers_lock:
+        for entry in [s for s in _subscribers if s[1] is queue]:
+            _subscribers.discard(entry)
@@ -0,0 +1,94 @@
+"""
+Cross-process file locks -- for files shared by several server workers.
+
+In production (start.py --prod / serve.py --workers N) each uvicorn worker
+is its own process, and the CLI tools (transfer.py, migrate_layout.py) can
+run next to the server. A threading.Lock only orders threads of one
+process, so read-modify-write cycles on shared files (articles.json, the
+revision logs, the session maintenance stamp) also take an OS-level lock on
+a lock file: fcntl.flock on POSIX, msvcrt.locking on Windows.
+
+FileLock combines both, so it can be used exactly like a threading.Lock
+(`with lock:`). It is not re-entrant.
+"""
+
+import os
+import threading
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+def _lock_fd(fd: int, blocking: bool) -> bool:
+    """Take an exclusive lock on an open file. False if busy and not blocking."""
+    if os.name == "nt":
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.05)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _unlock_fd(fd: int):
+    if os.name == "nt":
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """Exclusive lock across threads and processes, held on `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._thread_lock.acquire(blocking):
+            return False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Opened per acquire, so a forked child never shares the parent's lock
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                locked = _lock_fd(fd, blocking)
+            except BaseException:
+                os.close(fd)
+                raise
+            if not locked:
+                os.close(fd)
+                self._thread_lock.release()
+                return False
+            self._fd = fd
+            return True
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        try:
+            _unlock_fd(fd)
+        finally:
+            os.close(fd)
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
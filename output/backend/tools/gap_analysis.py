@@ -0,0 +1,199 @@
+"""
+Content gap analysis -- compares AI Overview text against an article locally.
+
+Used by optimize_for_aio so the AIO Analyzer receives a ranked list of what
+the article is missing instead of raw AIO text it has to diff by itself.
+
+How it works:
+  1. Split both texts into sentences and the article into ## sections.
+  2. Extract candidate concepts: runs of non-stopword words between
+     punctuation and stopwords (RAKE-style), plus their 1-3 word n-grams.
+  3. Weight AIO concepts by TF-IDF, using the article sections plus AIO
+     sentences as the document set, so generic words rank low.
+  4. A concept is covered if its tokens appear together in one article
+     sentence. Uncovered concepts are ranked by weight.
+  5. Each AIO sentence gets a coverage score (share of its concepts covered)
+     and the article section it overlaps most.
+
+Pure Python, no model calls.
+"""
+
+import math
+import re
+from collections import Counter
+
+from tools.text import STOPWORDS, tokenize
+
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_PHRASE_SPLIT = re.compile(r"[,;:()\[\]\"/]+")
+_MARKDOWN_NOISE = re.compile(r"!\[[^\]]*\]\([^)]*\)|\[([^\]]*)\]\([^)]*\)|[*_`>#|]")
+
+
+# ============================================================
+# Text helpers
+# ============================================================
+
+
+def _clean(text: str) -> str:
+    """Strip Markdown syntax (images, link targets, emphasis) from text."""
+    return _MARKDOWN_NOISE.sub(lambda m: m.group(1) or " ", text)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into non-trivial sentences."""
+    sentences = []
+    for part in _SENTENCE_SPLIT.split(_clean(text)):
+        part = part.strip(" -\t")
+        if len(part.split()) >= 3:
+            sentences.append(part)
+    return sentences
+
+
+def split_sections(markdown: str) -> list[tuple[str, str]]:
+    """Split an article into (heading, body) pairs on ## headings.
+
+    Text before the first ## heading is returned under the H1 title (or "Introduction").
+    """
+    sections = []
+    heading = "Introduction"
+    body = []
+    for line in markdown.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("# ") and not sections and not body:
+            heading = stripped[2:].strip()
+        elif stripped.startswith("## "):
+            sections.append((heading, "\n".join(body)))
+            heading = stripped[3:].strip()
+            body = []
+        else:
+            body.append(line)
+    sections.append((heading, "\n".join(body)))
+    return [(h, b) for h, b in sections if h or b.strip()]
+
+
+def _phrases(sentence: str) -> list[list[str]]:
+    """Runs of content words, split at punctuation and stopwords."""
+    phrases = []
+    for chunk in _PHRASE_SPLIT.split(sentence):
+        run = []
+        for token in tokenize(chunk):
+            if token in STOPWORDS:
+                if run:
+                    phrases.append(run)
+                run = []
+            else:
+                run.append(token)
+        if run:
+            phrases.append(run)
+    return phrases
+
+
+def extract_concepts(text: str, max_n: int = 3) -> Counter:
+    """Count candidate concepts: 1-3 word n-grams within content-word phrases."""
+    counts = Counter()
+    for sentence in split_sentences(text):
+        for phrase in _phrases(sentence):
+            for n in range(1, min(max_n, len(phrase)) + 1):
+                for i in range(len(phrase) - n + 1):
+                    gram = phrase[i:i + n]
+                    if n == 1 and (len(gram[0]) < 4 or gram[0].isdigit()):
+                        continue
+                    counts[" ".join(gram)] += 1
+    return counts
+
+
+# ============================================================
+# Gap analysis
+# ============================================================
+
+
+def _covered(concept: str, sentence_token_sets: list[set]) -> bool:
+    """True if every token of the concept appears together in one sentence."""
+    parts = set(concept.split())
+    return any(parts <= tokens for tokens in sentence_token_sets)
+
+
+def analyze_gaps(aio_text: str, article_markdown: str, top_n: int = 15) -> dict:
+    """Compare AI Overview text against an article.
+
+    Args:
+        aio_text: The AI Overview content.
+        article_markdown: The article's full Markdown.
+        top_n: Number of missing concepts and weakest AIO sentences to return.
+
+    Returns:
+        Dict with an overall coverage score (0-1), ranked missing concepts,
+        covered concepts, and the least-covered AIO sentences with the
+        article section that comes closest to each.
+    """
+    aio_sentences = split_sentences(aio_text)
+    sections = split_sections(article_markdown)
+    article_sentences = split_sentences(article_markdown)
+    sentence_sets = [set(tokenize(s)) for s in article_sentences]
+    heading_sets = [set(tokenize(h)) for h, _ in sections]
+
+    aio_concepts = extract_concepts(aio_text)
+    if not aio_concepts:
+        return {"coverage": 1.0, "missing_concepts": [], "covered_concepts": [], "weak_sentences": []}
+
+    # Document frequency over article sections + AIO sentences
+    documents = [set(extract_concepts(h + "\n" + b)) for h, b in sections]
+    documents += [set(extract_concepts(s)) for s in aio_sentences]
+    df = Counter()
+    for doc in documents:
+        df.update(doc)
+    n_docs = len(documents) or 1
+
+    def weight(concept: str) -> float:
+        tf = aio_concepts[concept]
+        idf = math.log((1 + n_docs) / (1 + df[concept])) + 1
+        # Multi-word concepts are more specific -- favor them slightly
+        return tf * idf * (1 + 0.5 * (concept.count(" ")))
+
+    covered, missing = [], []
+    for concept in aio_concepts:
+        target = covered if _covered(concept, sentence_sets + heading_sets) else missing
+        target.append((concept, weight(concept)))
+
+    total = sum(w for _, w in covered) + sum(w for _, w in missing)
+    coverage = sum(w for _, w in covered) / total if total else 1.0
+
+    # Drop missing n-grams that mostly repeat a higher-ranked one
+    # (sub-grams, or overlapping windows over the same phrase)
+    missing.sort(key=lambda cw: -cw[1])
+    ranked = []
+    for concept, w in missing:
+        parts = set(concept.split())
+        if any(len(parts & set(kept.split())) >= min(2, len(parts)) for kept, _ in ranked):
+            continue
+        ranked.append((concept, w))
+        if len(ranked) >= top_n:
+            break
+
+    # Score each AIO sentence and find its best-matching article section
+    weak = []
+    for sentence in aio_sentences:
+        concepts = extract_concepts(sentence)
+        if not concepts:
+            continue
+        hits = sum(1 for c in concepts if _covered(c, sentence_sets))
+        tokens = set(tokenize(sentence)) - STOPWORDS
+        best_section, best_overlap = None, 0.0
+        for (heading, body), section_tokens in zip(sections, (set(tokenize(h + " " + b)) for h, b in sections)):
+            overlap = len(tokens & section_tokens) / len(tokens) if tokens else 0.0
+            if overlap > best_overlap:
+                best_section, best_overlap = heading, overlap
+        weak.append({
+            "sentence": sentence,
+            "coverage": round(hits / len(concepts), 2),
+            "closest_section": best_section,
+        })
+    weak.sort(key=lambda s: s["coverage"])
+
+    return {
+        "coverage": round(coverage, 2),
+        "missing_concepts": [{"concept": c, "score": round(w, 2)} for c, w in ranked],
+        "covered_concepts": [c for c, _ in sorted(covered, key=lambda cw: -cw[1])[:top_n]],
+        "weak_sentences": [s for s in weak if s["coverage"] < 0.5][:top_n],
+    }
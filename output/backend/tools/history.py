@@ -0,0 +1,261 @@
+"""
+Chat history compaction -- keeps the leader's context small as conversations grow.
+
+The team replays the last few runs into the leader's context on every turn.
+Raw runs carry full ```aio-result blocks, AIO text, and whole articles, so
+each turn gets slower and costlier. When history is injected into a model
+call (HistoryCompactingClaude in agents/team.py), the messages of older runs
+are swapped for compacted copies: bulky payloads are replaced with short
+reference markers that keep what the leader needs to resolve "that article"
+or "the same keyword" (article IDs, titles, keywords, word counts) and drop
+everything else.
+
+Stored runs are never modified -- chat_sessions.db keeps the full history,
+and Agno stays the only writer of its tables.
+
+Settings (optional, read from the environment):
+  HISTORY_RAW_RUNS  -- most recent runs left untouched (default 1)
+"""
+
+import json
+import os
+import re
+import statistics
+import time
+
+from tools.sessions import DB_FILE, SESSION_TABLE
+
+
+_AIO_BLOCK = re.compile(r"```aio-result\s*\n(.*?)\n?```", re.DOTALL)
+# Matched against serialized runs, where nested JSON strings are escaped (\")
+_ARTICLE_ID = re.compile(r'\\?"article_id\\?"\s*:\s*\\?"([^"\\]+)')
+_KEYWORD = re.compile(r'\\?"keyword\\?"\s*:\s*\\?"([^"\\]+)|keyword=\\?"([^"\\]+)')
+
+# Dict keys whose values are bulky payloads -- replaced wholesale
+_ARTICLE_KEYS = {"article_markdown"}
+_AIO_TEXT_KEYS = {"content_markdown", "aio_content", "sections"}
+
+# Strings shorter than this are never rewritten
+_MIN_COMPACT_CHARS = 1200
+
+# Runs the leader replays each turn (num_history_runs in agents/team.py)
+_REPLAYED_RUNS = 5
+
+
+def _raw_runs() -> int:
+    try:
+        return max(0, int(os.getenv("HISTORY_RAW_RUNS", "").strip() or 1))
+    except ValueError:
+        return 1
+
+
+# ============================================================
+# Text compaction
+# ============================================================
+
+
+def _aio_marker(block: str) -> str:
+    """Reference line for an aio-result block."""
+    try:
+        data = json.loads(block)
+    except json.JSONDecodeError:
+        return "[aio-result omitted]"
+    refs = data.get("references") or []
+    return (
+        f'[aio-result omitted: keyword="{data.get("keyword", "")}", '
+        f'has_aio={str(bool(data.get("has_aio"))).lower()}, references={len(refs)}]'
+    )
+
+
+def _article_marker(markdown: str) -> str:
+    """Reference line for a full article body."""
+    title = ""
+    for line in markdown.split("\n"):
+        if line.startswith("# "):
+            title = line[2:].strip()
+            break
+    return f'[article omitted: "{title}", ~{len(markdown.split())} words]'
+
+
+def _looks_like_article(text: str) -> int:
+    """Offset of the H1 that starts an embedded article, or -1."""
+    if len(text) < _MIN_COMPACT_CHARS or text.count("\n## ") < 3:
+        return -1
+    match = re.search(r"(?m)^# \S", text)
+    return match.start() if match else -1
+
+
+def compact_text(text: str) -> str:
+    """Replace aio-result blocks and embedded articles with reference markers.
+
+    Idempotent: compacting already-compacted text returns it unchanged.
+    """
+    if len(text) < _MIN_COMPACT_CHARS:
+        return text
+
+    text = _AIO_BLOCK.sub(lambda m: _aio_marker(m.group(1)), text)
+
+    start = _looks_like_article(text)
+    if start >= 0:
+        text = text[:start] + _article_marker(text[start:])
+
+    # Tool results are often JSON -- compact their bulky fields too
+    stripped = text.strip()
+    if stripped[:1] in "{[":
+        try:
+            data = json.loads(stripped)
+        except json.JSONDecodeError:
+            return text
+        return json.dumps(_compact_value(data), ensure_ascii=False)
+
+    return text
+
+
+def _compact_value(value):
+    """Recursively compact strings and known bulky keys in a JSON-like value."""
+    if isinstance(value, str):
+        return compact_text(value)
+    if isinstance(value, list):
+        return [_compact_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    result = {}
+    for key, v in value.items():
+        if key in _ARTICLE_KEYS and isinstance(v, str) and len(v) >= _MIN_COMPACT_CHARS:
+            result[key] = _article_marker(v)
+        elif key in _AIO_TEXT_KEYS and v and not str(v).startswith("[aio text"):
+            text = "\n\n".join(v) if isinstance(v, list) else str(v)
+            result[key] = f"[aio text omitted, ~{len(text.split())} words]"
+        elif key == "arguments" and isinstance(v, str):
+            # Tool call arguments are a JSON string (e.g. save_article's full markdown)
+            try:
+                result[key] = json.dumps(_compact_value(json.loads(v)), ensure_ascii=False)
+            except json.JSONDecodeError:
+                result[key] = compact_text(v)
+        else:
+            result[key] = _compact_value(v)
+    return result
+
+
+def extract_references(value) -> dict:
+    """Article IDs and keywords mentioned anywhere in a JSON-like value (runs or messages)."""
+    raw = json.dumps(value, ensure_ascii=False, default=str)
+    article_ids = sorted(set(_ARTICLE_ID.findall(raw)))
+    keywords = sorted({a or b for a, b in _KEYWORD.findall(raw)})
+    return {"article_ids": article_ids, "keywords": keywords}
+
+
+# ============================================================
+# History messages
+# ============================================================
+
+
+def _compact_message(message):
+    """Compacted copy of one Agno Message (content and tool call arguments), or the message itself."""
+    content = message.content
+    new_content = compact_text(content) if isinstance(content, str) else content
+    tool_calls = message.tool_calls
+    new_calls = _compact_value(tool_calls) if tool_calls else tool_calls
+    if new_content == content and new_calls == tool_calls:
+        return message
+    return message.model_copy(update={"content": new_content, "tool_calls": new_calls})
+
+
+def compact_history(messages: list, keep_raw: int = None) -> list:
+    """Compact the history messages of all but the most recent `keep_raw` runs.
+
+    Works on the message list of a model call: only messages Agno tagged
+    from_history are touched, and a history run starts at each of its user
+    messages. Returns a new list -- the messages passed in (and the session's
+    stored runs behind them) are left as they are.
+    """
+    if keep_raw is None:
+        keep_raw = _raw_runs()
+    starts = [i for i, m in enumerate(messages) if getattr(m, "from_history", False) and m.role == "user"]
+    if len(starts) <= keep_raw:
+        return messages
+    cutoff = starts[len(starts) - keep_raw] if keep_raw else len(messages)
+    compacted = list(messages)
+    for i in range(cutoff):
+        if getattr(messages[i], "from_history", False):
+            compacted[i] = _compact_message(messages[i])
+    return compacted
+
+
+# ============================================================
+# Report
+# ============================================================
+
+
+_db = None
+
+
+def _session_db():
+    """A SqliteDb on the session file, for reading sessions the way the team does."""
+    global _db
+    if _db is None:
+        from agno.db.sqlite import SqliteDb
+
+        _db = SqliteDb(db_file=DB_FILE, session_table=SESSION_TABLE)
+    return _db
+
+
+def _median_ms(fn, repeats: int = 5) -> tuple[float, object]:
+    """Median wall time of fn() in ms, and its last result."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3), result
+
+
+def _messages_text(messages: list) -> str:
+    return json.dumps([m.to_dict() for m in messages], ensure_ascii=False, default=str)
+
+
+def history_report(session_id: str, db=None) -> dict:
+    """Compare the raw and compacted history the leader would get next turn.
+
+    Reads the session through Agno (`db`, default: chat_sessions.db), takes
+    the history the team replays (the last _REPLAYED_RUNS runs), and compacts
+    it with the live policy (HISTORY_RAW_RUNS). Nothing is written. Token
+    counts are estimated at ~4 characters per token; load_ms is the median
+    time to load the session, compact_ms the median time compaction adds to
+    each model call.
+
+    Returns:
+        Dict with run counts, raw/compacted history sizes, the estimated
+        saving, timings, and the entity references the compacted history
+        still carries.
+    """
+    db = db or _session_db()
+    load_ms, session = _median_ms(lambda: db.get_session(session_id=session_id, session_type=None))
+    if session is None:
+        return {"error": f"Session {session_id} not found."}
+
+    # As the team builds it: system messages skipped, copies tagged from_history
+    history = [
+        m.model_copy(update={"from_history": True})
+        for m in session.get_messages(last_n_runs=_REPLAYED_RUNS, skip_roles=["system"])
+    ]
+    keep_raw = _raw_runs()
+    compact_ms, compacted = _median_ms(lambda: compact_history(history, keep_raw=keep_raw))
+
+    raw_chars = len(_messages_text(history))
+    compact_chars = len(_messages_text(compacted))
+    return {
+        "session_id": session_id,
+        "runs": len(session.runs or []),
+        "replayed_runs": sum(1 for m in history if m.role == "user"),
+        "keep_raw": keep_raw,
+        "replayed_raw_chars": raw_chars,
+        "replayed_compacted_chars": compact_chars,
+        "reduction_pct": round(100 * (1 - compact_chars / raw_chars), 1) if raw_chars else 0.0,
+        "replayed_raw_tokens_est": raw_chars // 4,
+        "replayed_compacted_tokens_est": compact_chars // 4,
+        "load_ms": load_ms,
+        "compact_ms": compact_ms,
+        "references": extract_references([m.to_dict() for m in compacted]),
+    }
@@ -0,0 +1,124 @@
+"""
+Startup import profile -- shows where serve.py's cold start time goes.
+
+Runs `python -X importtime` in a fresh interpreter that imports serve and
+then calls create_app(), which is everything a server process does before it
+can answer /health. It then builds the team and AgentOS app, which a worker
+defers until the first chat or AgentOS request. The session DB goes to a temp
+directory (SESSION_DB_FILE), so nothing is left in the tree. Reports:
+  - wall time for `import serve`, create_app(), and the deferred AgentOS build
+  - top-level packages by total self import time (all three phases)
+  - the slowest individual imports (cumulative, including their own imports)
+
+Usage (from output/backend):
+    python serve.py --profile-imports [N]
+    python -m tools.import_profile [N]      (N = rows per table, default 15)
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+
+_BACKEND_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# Runs in the child interpreter; the timings are printed as the last stdout line
+_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import serve
+t1 = time.perf_counter()
+serve.create_app()
+t2 = time.perf_counter()
+serve._build_agent_os()
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_serve_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "agent_os_build_ms": (t3 - t2) * 1000,
+}))
+"""
+
+
+def profile_startup() -> dict:
+    """Import serve and build the app in a fresh interpreter, with -X importtime.
+
+    Returns:
+        Dict with phase timings (ms) and per-module (self_us, cumulative_us, depth) rows.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep background maintenance and cache warm-up out of the numbers
+        env = dict(
+            os.environ,
+            SESSION_MAINTENANCE_HOURS="0",
+            ANALYTICS_WARMUP="0",
+            SESSION_DB_FILE=os.path.join(tmp, "chat_sessions.db"),
+        )
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE],
+            cwd=_BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed")
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {**phases, "modules": modules}
+
+
+def format_report(profile: dict, rows: int = 15) -> str:
+    modules = profile["modules"]
+    by_package = defaultdict(int)
+    for m in modules:
+        by_package[m["module"].split(".")[0]] += m["self_us"]
+    total_ms = sum(by_package.values()) / 1000
+
+    lines = [
+        f"import serve:   {profile['import_serve_ms']:8.1f} ms",
+        f"create_app():   {profile['create_app_ms']:8.1f} ms   (then /health answers)",
+        f"AgentOS build:  {profile['agent_os_build_ms']:8.1f} ms   (deferred to the first chat or AgentOS request)",
+        f"module imports: {total_ms:8.1f} ms over {len(modules)} modules",
+        "",
+        f"Top {rows} packages (self time, all their modules):",
+    ]
+    for package, us in sorted(by_package.items(), key=lambda p: -p[1])[:rows]:
+        share = 100 * us / 1000 / total_ms if total_ms else 0.0
+        lines.append(f"  {us / 1000:8.1f} ms  {share:5.1f}%  {package}")
+    lines += ["", f"Top {rows} imports (cumulative):"]
+    for m in sorted(modules, key=lambda m: -m["cumulative_us"])[:rows]:
+        lines.append(f"  {m['cumulative_us'] / 1000:8.1f} ms  {m['module']}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    numbers = [a for a in argv if a.isdigit()]
+    try:
+        profile = profile_startup()
+    except RuntimeError as e:
+        print(f"Startup failed: {e}")
+        return 1
+    print(format_report(profile, int(numbers[0]) if numbers else 15))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Listing benchmark -- time and peak memory per article listing at catalog scale.
+
+Writes a scratch catalog (a temp CONTENT_DIR, so content/ is never touched)
+of --articles entries straight into articles.json, then times each listing
+path --repeats times and reports the median time and the peak memory
+tracemalloc saw during one call:
+  - dicts (before):   the listing path before records -- parse articles.json,
+                      build list_articles()-style dicts, copy them into
+                      summaries, json.dumps
+  - cold:             listing_json() right after articles.json changed
+                      (parse + records + serialize)
+  - cached:           listing_json() with the catalog unchanged
+  - filtered:         listing_json(status="published") (not cached)
+  - records:          list_article_records() (no serialization)
+  - list_articles:    the dict-returning list_articles()
+
+Usage (from output/backend):
+    python -m tools.listing_bench [--articles 100000] [--repeats 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def _seed(content_dir: str, count: int):
+    """Write articles.json directly -- import_articles would also write count .md files."""
+    metadata = {}
+    for i in range(count):
+        metadata[f"bench-article-{i}"] = {
+            "topic": f"Benchmark topic number {i}",
+            "keywords": [f"bench keyword {i}", f"bench keyword {i % 97}"],
+            "status": "published" if i % 4 == 0 else "review",
+            "word_count": 1200 + i % 800,
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "updated_at": "2026-01-02T00:00:00+00:00",
+        }
+    os.makedirs(content_dir, exist_ok=True)
+    with open(os.path.join(content_dir, "articles.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+
+def _dict_listing(storage) -> str:
+    """The /api/articles path before records, reproduced for comparison."""
+    articles = []
+    for article_id, entry in storage._load_metadata().items():
+        keywords = entry.get("keywords", [])
+        articles.append({
+            "id": article_id,
+            "topic": entry.get("topic", ""),
+            "target_keywords": json.dumps(keywords) if keywords else None,
+            "status": entry.get("status", "review"),
+            "article_markdown": None,
+            "output_file": storage._md_path(article_id),
+            "word_count": entry.get("word_count"),
+            "created_at": entry.get("created_at"),
+            "updated_at": entry.get("updated_at"),
+        })
+    return json.dumps([
+        {key: a[key] for key in ("id", "topic", "status", "word_count", "created_at", "updated_at")}
+        for a in articles
+    ])
+
+
+def _touch(path: str):
+    """Change articles.json's stat key without changing its content."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def _measure(fn, repeats: int, before=None) -> tuple[float, float]:
+    """Median ms over `repeats` calls, and peak MB of one traced call."""
+    times = []
+    for _ in range(repeats):
+        if before:
+            before()
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    if before:
+        before()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / (1 << 20)
+
+
+def run(articles: int, repeats: int) -> list[dict]:
+    from tools import storage
+
+    print(f"Writing {articles} articles to {storage._CONTENT_DIR} ...", file=sys.stderr)
+    _seed(storage._CONTENT_DIR, articles)
+    invalidate = lambda: _touch(storage._METADATA_FILE)  # noqa: E731
+
+    storage.listing_json()  # Warm the cache for the cached case
+    cases = [
+        ("dicts (before)", lambda: _dict_listing(storage), None),
+        ("cold", storage.listing_json, invalidate),
+        ("cached", storage.listing_json, None),
+        ("filtered", lambda: storage.listing_json(status="published"), None),
+        ("records", storage.list_article_records, None),
+        ("list_articles", storage.list_articles, None),
+    ]
+    results = []
+    for name, fn, before in cases:
+        if before is None:
+            fn()  # Leave the records cache warm, as a running server would have it
+        ms, peak_mb = _measure(fn, repeats, before)
+        results.append({"case": name, "median_ms": round(ms, 1), "peak_mb": round(peak_mb, 1)})
+    return results
+
+
+def format_report(results: list[dict], articles: int) -> str:
+    lines = [f"{articles} articles", f"{'case':16} {'median':>10} {'peak':>10}"]
+    for r in results:
+        lines.append(f"{r['case']:16} {r['median_ms']:8.1f}ms {r['peak_mb']:8.1f}MB")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time and peak memory per article listing")
+    parser.add_argument("--articles", type=int, default=100_000, help="Articles in the scratch catalog")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed calls per case (median reported)")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="seo-listing-bench-")
+    os.environ["CONTENT_DIR"] = scratch  # Read by tools.storage at import
+    if "tools.storage" in sys.modules:
+        print("tools.storage was imported before CONTENT_DIR was set -- run this as a script.")
+        return 1
+    try:
+        results = run(args.articles, args.repeats)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print(format_report(results, args.articles))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Listing load test -- /api/articles latency while saves are in flight.
+
+Seeds a scratch catalog (a temp CONTENT_DIR, so content/ is never touched),
+serves serve.base_app with uvicorn on a free local port in this process, and
+fires concurrent GET requests at it in two phases:
+  - idle:    listings only
+  - saving:  the same load while --savers threads call storage.save_article
+             in a loop, the way agent tool calls do
+
+Each phase is run against /api/articles (storage on the async_storage pool)
+and against a probe route that calls storage directly on the event loop, which
+is what the routes did before. Reports p50/p95/p99/max latency per phase.
+
+Usage (from output/backend):
+    python -m tools.load_test [--articles 5000] [--requests 400] [--concurrency 16] [--savers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+
+def _percentile(sorted_ms: list[float], pct: float) -> float:
+    index = min(len(sorted_ms) - 1, max(0, round(pct / 100 * len(sorted_ms)) - 1))
+    return sorted_ms[index]
+
+
+def _article(i: int) -> str:
+    sections = "\n\n".join(
+        f"## Section {s}\n\n" + f"Load test body text for article {i}, section {s}. " * 25 for s in range(6)
+    )
+    return f"# Load test article {i}\n\n{sections}\n"
+
+
+def _seed(storage, count: int):
+    batch = []
+    for i in range(count):
+        batch.append({"id": f"seed-{i}", "topic": f"Seed topic {i}",
+                      "keywords": [f"seed keyword {i}"], "article_markdown": _article(i)})
+        if len(batch) == 500:
+            storage.import_articles(batch)
+            batch = []
+    if batch:
+        storage.import_articles(batch)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _hammer(url: str, requests: int, concurrency: int) -> list[float]:
+    """GET url `requests` times with `concurrency` in flight. Returns sorted latencies (ms)."""
+    import httpx
+
+    latencies = []
+    queue = iter(range(requests))
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        async def worker():
+            for _ in queue:
+                started = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sorted(latencies)
+
+
+def _start_savers(storage, count: int) -> tuple[threading.Event, list, list]:
+    stop = threading.Event()
+    saves = []
+    body = _article(-1)
+
+    def save_loop(n: int):
+        i = 0
+        while not stop.is_set():
+            storage.save_article(f"Saver {n} article {i}", body, keywords=f"saver {n} keyword {i}")
+            saves.append(1)
+            i += 1
+
+    threads = [threading.Thread(target=save_loop, args=(n,), daemon=True) for n in range(count)]
+    for t in threads:
+        t.start()
+    return stop, threads, saves
+
+
+def run(articles: int, requests: int, concurrency: int, savers: int) -> list[dict]:
+    import uvicorn
+
+    import serve
+    from tools import storage
+
+    print(f"Seeding {articles} articles in {storage._CONTENT_DIR} ...", file=sys.stderr)
+    _seed(storage, articles)
+
+    # The route shape before async_storage: blocking storage call on the event loop
+    async def blocking_listing():
+        from fastapi.responses import Response
+
+        return Response(storage.listing_json(), media_type="application/json")
+
+    serve.base_app.add_api_route("/_load_test/articles-blocking", blocking_listing, methods=["GET"])
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(serve.base_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    results = []
+    try:
+        for route in ("/api/articles", "/_load_test/articles-blocking"):
+            for phase in ("idle", "saving"):
+                stop = None
+                if phase == "saving":
+                    stop, threads, saves = _start_savers(storage, savers)
+                started = time.perf_counter()
+                latencies = asyncio.run(_hammer(base + route, requests, concurrency))
+                elapsed = time.perf_counter() - started
+                if stop is not None:
+                    stop.set()
+                    for t in threads:
+                        t.join()
+                results.append({
+                    "route": route,
+                    "phase": phase,
+                    "requests": len(latencies),
+                    "saves": len(saves) if stop is not None else 0,
+                    "rps": round(len(latencies) / elapsed, 1),
+                    "p50_ms": round(_percentile(latencies, 50), 1),
+                    "p95_ms": round(_percentile(latencies, 95), 1),
+                    "p99_ms": round(_percentile(latencies, 99), 1),
+                    "max_ms": round(latencies[-1], 1),
+                })
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+    return results
+
+
+def format_report(results: list[dict]) -> str:
+    lines = [f"{'route':32} {'phase':7} {'reqs':>5} {'saves':>6} {'rps':>7} "
+             f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+    for r in results:
+        lines.append(
+            f"{r['route']:32} {r['phase']:7} {r['requests']:5} {r['saves']:6} {r['rps']:7.1f} "
+            f"{r['p50_ms']:6.1f}ms {r['p95_ms']:6.1f}ms {r['p99_ms']:6.1f}ms {r['max_ms']:6.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="/api/articles latency under concurrent saves")
+    parser.add_argument("--articles", type=int, default=5000, help="Articles in the scratch catalog")
+    parser.add_argument("--requests", type=int, default=400, help="GET requests per phase")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--savers", type=int, default=4, help="Threads saving articles during the saving phase")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="seo-load-test-")
+    os.environ["CONTENT_DIR"] = scratch  # Read by tools.storage at import
+    if "tools.storage" in sys.modules:
+        print("tools.storage was imported before CONTENT_DIR was set -- run this as a script.")
+        return 1
+    try:
+        results = run(args.articles, args.requests, args.concurrency, args.savers)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
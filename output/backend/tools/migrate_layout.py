@@ -0,0 +1,83 @@
+"""
+Content layout migration -- moves article files between flat and sharded layouts.
+
+  flat:     content/{id}.md            content/revisions/{id}.jsonl
+  sharded:  content/md/{ab}/{cd}/{id}.md  content/revisions/{ab}/{cd}/{id}.jsonl
+
+Stop the server first: running processes read the layout once at startup.
+Safe to re-run -- files already in the target layout are skipped, so an
+interrupted migration is resumed by running it again.
+
+Usage (from output/backend):
+    python -m tools.migrate_layout sharded
+    python -m tools.migrate_layout flat
+"""
+
+import os
+import sys
+
+from tools import storage
+from tools.revisions import _REVISIONS_DIR, _log_path
+
+
+_LAYOUTS = ("flat", "sharded")
+
+
+def _move(src: str, dst: str) -> bool:
+    """Move src to dst if src exists. Returns True if a file was moved."""
+    if src == dst or not os.path.exists(src):
+        return False
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    os.replace(src, dst)
+    return True
+
+
+def _remove_empty_dirs(root: str, keep_root: bool):
+    """Delete empty shard directories left behind under root."""
+    if not os.path.isdir(root):
+        return
+    for dirpath, _, _ in sorted(os.walk(root), key=lambda w: -len(w[0])):
+        if (dirpath != root or not keep_root) and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def migrate(target: str) -> dict:
+    """Move every article (and its revision log) into the target layout.
+
+    Returns:
+        Dict with the target layout and how many files were moved or already in place.
+    """
+    if target not in _LAYOUTS:
+        raise ValueError(f"Unknown layout '{target}'. Use one of: {', '.join(_LAYOUTS)}.")
+    source = "sharded" if target == "flat" else "flat"
+
+    moved = skipped = 0
+    with storage._lock:
+        for article_id in storage._load_metadata():
+            for src, dst in (
+                (storage._md_path(article_id, source), storage._md_path(article_id, target)),
+                (_log_path(article_id, source), _log_path(article_id, target)),
+            ):
+                if _move(src, dst):
+                    moved += 1
+                elif os.path.exists(dst):
+                    skipped += 1
+
+        # Record the layout only once every file is in place
+        os.makedirs(storage._CONTENT_DIR, exist_ok=True)
+        with open(storage._LAYOUT_FILE, "w", encoding="utf-8") as f:
+            f.write(target)
+        storage._layout = target
+
+        if target == "flat":
+            _remove_empty_dirs(storage._SHARD_DIR, keep_root=False)
+            _remove_empty_dirs(_REVISIONS_DIR, keep_root=True)
+
+    return {"layout": target, "moved": moved, "already_in_place": skipped}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in _LAYOUTS:
+        print(__doc__)
+        sys.exit(1)
+    print(migrate(sys.argv[1]))
@@ -0,0 +1,342 @@
+"""
+Production profiling -- on-demand stack sampling and slow-request capture.
+
+Used by serve.py's /api/admin routes, which require an X-Admin-Token header
+matching ADMIN_TOKEN. Nothing here runs unless ADMIN_TOKEN is set.
+
+  - Sampling window: a background thread samples every thread's stack at
+    _SAMPLE_HZ for N seconds. The result is aggregated as collapsed stacks
+    ("thread;outer;...;inner count"), which flamegraph.pl, speedscope, and
+    inferno read directly.
+  - Slow requests: SlowRequestMiddleware times every request. Once a request
+    has run longer than SLOW_REQUEST_MS, a watchdog samples stacks at _SLOW_HZ
+    until it finishes, so there's no sampling cost while nothing is slow.
+    Finished slow requests keep their stacks plus a timeline of the tool calls
+    they made. The article event stream is excluded, since it stays open indefinitely.
+  - Tool timelines: record_tool_call is an agno tool hook on the team and
+    every agent (via tool_hooks(), only while ADMIN_TOKEN is set). It times
+    each tool call and attaches it to the current request. It is a plain sync
+    hook: an async hook would make agno run sync tools on the event loop
+    instead of in a worker thread. Async tools come back to it as awaitables,
+    which it wraps so their time still counts.
+
+Samples cover all threads of the worker. Requests running at the same time
+show up in each other's stacks, labelled by thread. With several workers,
+each worker keeps its own data.
+
+Settings (optional, read from the environment):
+  ADMIN_TOKEN      -- enables the admin routes and slow-request capture
+  SLOW_REQUEST_MS  -- latency above which a request is captured (default 2000, 0 = off)
+"""
+
+import contextvars
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+
+_SAMPLE_HZ = 100                    # Stack samples per second in a profiling window
+_SLOW_HZ = 20                       # Stack samples per second for requests past the threshold
+_MAX_WINDOW_SECONDS = 300
+_MAX_STACK_DEPTH = 128
+_SLOW_KEEP = 50                     # Most recent slow requests kept
+_TOOL_CALLS_KEEP = 200              # Tool calls kept per request
+# Long-lived streams and the admin routes themselves are never timed
+_UNTIMED_PREFIXES = ("/api/articles/events", "/api/admin/")
+
+_lock = threading.Lock()
+
+_current_request: contextvars.ContextVar[dict | None] = contextvars.ContextVar("profiling_request", default=None)
+
+
+def admin_token() -> str:
+    return os.getenv("ADMIN_TOKEN", "").strip()
+
+
+def _slow_threshold_ms() -> float:
+    try:
+        return max(0.0, float(os.getenv("SLOW_REQUEST_MS", "").strip() or 2000))
+    except ValueError:
+        return 2000.0
+
+
+# ============================================================
+# Stack sampling
+# ============================================================
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+def _sample_stacks(skip_ident: int) -> list[str]:
+    """One collapsed stack (root first) per thread, except the sampler's own."""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    stacks = []
+    for ident, frame in sys._current_frames().items():
+        if ident == skip_ident:
+            continue
+        labels = []
+        while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.append(names.get(ident, f"thread-{ident}"))
+        stacks.append(";".join(reversed(labels)))
+    return stacks
+
+
+def collapsed(counts: Counter) -> str:
+    """Flamegraph-ready text: one "stack count" line per distinct stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class _Window:
+    """A fixed-length sampling session over every thread."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started_at = time.time()
+        self.samples = 0
+        self.counts = Counter()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="profiler-window", daemon=True)
+
+    def _run(self):
+        me = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while not self.stop.is_set() and time.monotonic() < deadline:
+            stacks = _sample_stacks(me)
+            with _lock:
+                self.counts.update(stacks)
+                self.samples += 1
+            self.stop.wait(1 / _SAMPLE_HZ)
+
+    @property
+    def running(self) -> bool:
+        return self.thread.is_alive()
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "samples": self.samples,
+            "distinct_stacks": len(self.counts),
+        }
+
+
+_window: _Window | None = None
+
+
+def start_window(seconds: float) -> dict:
+    """Start sampling for `seconds` (capped). Returns the window status, or an error if one is running."""
+    global _window
+    with _lock:
+        if _window is not None and _window.running:
+            return {"error": "A profiling window is already running.", **_window.status()}
+        _window = _Window(min(max(seconds, 0.1), _MAX_WINDOW_SECONDS))
+        _window.thread.start()
+        return _window.status()
+
+
+def stop_window() -> dict:
+    if _window is None:
+        return {"error": "No profiling window has been started."}
+    _window.stop.set()
+    _window.thread.join(timeout=2)
+    return _window.status()
+
+
+def window_status() -> dict:
+    if _window is None:
+        return {"running": False, "samples": 0}
+    with _lock:
+        return _window.status()
+
+
+def window_collapsed() -> str | None:
+    if _window is None:
+        return None
+    with _lock:
+        return collapsed(_window.counts)
+
+
+# ============================================================
+# Slow-request capture
+# ============================================================
+
+
+_ids = itertools.count(1)
+_in_flight: dict[int, dict] = {}
+_slow: deque = deque(maxlen=_SLOW_KEEP)
+_wakeup = threading.Event()
+_watchdog: threading.Thread | None = None
+
+
+def _watch():
+    """Sample stacks for in-flight requests that are past the threshold."""
+    me = threading.get_ident()
+    while True:
+        with _lock:
+            active = bool(_in_flight)
+        if not active:
+            _wakeup.wait()
+            _wakeup.clear()
+            continue
+        threshold = _slow_threshold_ms() / 1000
+        now = time.perf_counter()
+        with _lock:
+            slow = [r for r in _in_flight.values() if now - r["_start"] >= threshold]
+        if slow:
+            stacks = _sample_stacks(me)
+            with _lock:
+                for record in slow:
+                    record["_stacks"].update(stacks)
+                    record["samples"] += 1
+        time.sleep(1 / _SLOW_HZ)
+
+
+def _ensure_watchdog():
+    global _watchdog
+    with _lock:
+        if _watchdog is None:
+            _watchdog = threading.Thread(target=_watch, name="slow-request-watchdog", daemon=True)
+            _watchdog.start()
+
+
+def slow_requests() -> list[dict]:
+    """Captured slow requests, newest first (without stacks or tool calls)."""
+    with _lock:
+        return [
+            {k: v for k, v in r.items() if not k.startswith("_") and k != "tool_calls"}
+            | {"tool_call_count": len(r["tool_calls"])}
+            for r in reversed(_slow)
+        ]
+
+
+def slow_request(request_id: int) -> dict | None:
+    """One captured slow request with its tool-call timeline, or None."""
+    with _lock:
+        for r in _slow:
+            if r["id"] == request_id:
+                return {k: v for k, v in r.items() if not k.startswith("_")}
+    return None
+
+
+def slow_request_collapsed(request_id: int) -> str | None:
+    with _lock:
+        for r in _slow:
+            if r["id"] == request_id:
+                return collapsed(r["_stacks"])
+    return None
+
+
+class SlowRequestMiddleware:
+    """ASGI middleware that times requests to the end of their response body.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses (chat
+    SSE, exports) are timed until their last chunk, not just their headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not _slow_threshold_ms()
+            or not admin_token()
+            or scope.get("path", "").startswith(_UNTIMED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        _ensure_watchdog()
+        record = {
+            "id": next(_ids),
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "status": None,
+            "started_at": time.time(),
+            "duration_ms": None,
+            "samples": 0,
+            "tool_calls": [],
+            "_start": time.perf_counter(),
+            "_stacks": Counter(),
+        }
+        with _lock:
+            _in_flight[record["id"]] = record
+        _wakeup.set()
+        token = _current_request.set(record)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                record["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            duration = (time.perf_counter() - record["_start"]) * 1000
+            record["duration_ms"] = round(duration, 1)
+            with _lock:
+                _in_flight.pop(record["id"], None)
+                if duration >= _slow_threshold_ms():
+                    _slow.append(record)
+
+
+# ============================================================
+# Tool-call timelines (agno tool hook)
+# ============================================================
+
+
+def _add_tool_call(record: dict, function_name: str, started: float, error: str | None):
+    if len(record["tool_calls"]) < _TOOL_CALLS_KEEP:
+        record["tool_calls"].append({
+            "tool": function_name,
+            "start_ms": round((started - record["_start"]) * 1000, 1),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "thread": threading.current_thread().name,
+            "error": error,
+        })
+
+
+async def _timed_async_call(result, record: dict, function_name: str, started: float):
+    error = None
+    try:
+        return await result
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        _add_tool_call(record, function_name, started, error)
+
+
+def record_tool_call(function_name: str, function_call, arguments: dict):
+    """agno tool hook: time each tool call and attach it to the current request."""
+    record = _current_request.get()
+    if record is None:
+        return function_call(**arguments)
+    started = time.perf_counter()
+    try:
+        result = function_call(**arguments)
+    except Exception as e:
+        _add_tool_call(record, function_name, started, str(e))
+        raise
+    if inspect.isawaitable(result):
+        # Async tool (agno awaits what the hook returns) -- time it to completion
+        return _timed_async_call(result, record, function_name, started)
+    _add_tool_call(record, function_name, started, None)
+    return result
+
+
+def tool_hooks() -> list | None:
+    """Tool hooks for the team and agents: record_tool_call while ADMIN_TOKEN is set, else none."""
+    return [record_tool_call] if admin_token() else None
@@ -0,0 +1,233 @@
+"""
+Shared research corpus -- search results reused across articles in a batch.
+
+Every web_search result is saved in content/research.db (SQLite),
+deduplicated by URL. Each result is linked to the normalized query that
+found it. Later articles on the same topic cluster can then reuse the
+research instead of searching again:
+  - web_search serves an identical (normalized) query from the store while it is fresh
+  - lookup_research returns stored results for any earlier queries that overlap the topic
+
+A query's "cluster key" is its sorted set of content words, so "SEO tips for
+beginners" and "beginners SEO tips" share research.
+
+Settings (optional, read from the environment):
+  RESEARCH_FRESHNESS_HOURS  -- how long stored research is reused (default 72)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from tools.storage import _CONTENT_DIR
+from tools.text import content_words
+
+
+_DB_FILE = os.path.join(_CONTENT_DIR, "research.db")
+# Serializes writes and the one-time schema setup. Reentrant because
+# store_search holds it while it connects.
+_db_lock = threading.RLock()
+_initialized = False
+
+
+def _freshness_seconds() -> float:
+    try:
+        hours = float(os.getenv("RESEARCH_FRESHNESS_HOURS", "").strip() or 72)
+    except ValueError:
+        hours = 72
+    return max(0.0, hours) * 3600
+
+
+def cluster_key(text: str) -> str:
+    """Normalized topic key: sorted unique content words."""
+    return " ".join(sorted(set(content_words(text))))
+
+
+# ============================================================
+# Internal helpers
+# ============================================================
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    os.makedirs(_CONTENT_DIR, exist_ok=True)
+    conn = sqlite3.connect(_DB_FILE, timeout=30)
+    if not _initialized:
+        with _db_lock:
+            if not _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS results (
+                        url TEXT PRIMARY KEY,
+                        title TEXT,
+                        description TEXT,
+                        first_seen REAL,
+                        last_seen REAL
+                    );
+                    CREATE TABLE IF NOT EXISTS searches (
+                        query_key TEXT PRIMARY KEY,
+                        query TEXT,
+                        fetched_at REAL
+                    );
+                    CREATE TABLE IF NOT EXISTS search_results (
+                        query_key TEXT,
+                        url TEXT,
+                        rank INTEGER,
+                        PRIMARY KEY (query_key, url)
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_searches_fetched ON searches (fetched_at);
+                """)
+                _initialized = True
+    return conn
+
+
+def _results_for(conn, query_key: str, limit: int) -> list[dict]:
+    rows = conn.execute(
+        """SELECT r.title, r.url, r.description FROM search_results s
+           JOIN results r ON r.url = s.url
+           WHERE s.query_key = ? ORDER BY s.rank LIMIT ?""",
+        (query_key, limit),
+    ).fetchall()
+    return [{"title": t, "url": u, "description": d} for t, u, d in rows]
+
+
+# ============================================================
+# Public API (used by search.py and clustering.py)
+# ============================================================
+
+
+def store_search(query: str, results: list[dict]):
+    """Save a search and its results. Results are upserted by URL."""
+    key = cluster_key(query)
+    if not key:
+        return
+    now = time.time()
+    with _db_lock:
+        conn = _connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (query_key, query, fetched_at) VALUES (?, ?, ?)",
+                (key, query, now),
+            )
+            conn.execute("DELETE FROM search_results WHERE query_key = ?", (key,))
+            for rank, r in enumerate(results):
+                url = r.get("url")
+                if not url:
+                    continue
+                conn.execute(
+                    """INSERT INTO results (url, title, description, first_seen, last_seen)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET
+                           title = excluded.title,
+                           description = excluded.description,
+                           last_seen = excluded.last_seen""",
+                    (url, r.get("title", ""), r.get("description", ""), now, now),
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO search_results (query_key, url, rank) VALUES (?, ?, ?)",
+                    (key, url, rank),
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def cached_search(query: str, max_results: int) -> list[dict] | None:
+    """Fresh stored results for the same normalized query, or None."""
+    key = cluster_key(query)
+    if not key or not os.path.exists(_DB_FILE):
+        return None
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT fetched_at FROM searches WHERE query_key = ?", (key,)
+        ).fetchone()
+        if not row or time.time() - row[0] > _freshness_seconds():
+            return None
+        results = _results_for(conn, key, max_results)
+        return results or None
+    finally:
+        conn.close()
+
+
+def stored_urls(query: str) -> set[str]:
+    """URLs of fresh stored results for the same normalized query (empty if none)."""
+    key = cluster_key(query)
+    if not key or not os.path.exists(_DB_FILE):
+        return set()
+    cutoff = time.time() - _freshness_seconds()
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            """SELECT s.url FROM search_results s
+               JOIN searches q ON q.query_key = s.query_key
+               WHERE s.query_key = ? AND q.fetched_at >= ?""",
+            (key, cutoff),
+        ).fetchall()
+        return {row[0] for row in rows}
+    finally:
+        conn.close()
+
+
+# ============================================================
+# Agent-facing tool functions (return JSON strings)
+# ============================================================
+
+
+def lookup_research(topic: str, max_results: int = 15, min_overlap: float = 0.5) -> str:
+    """Look up stored research from earlier searches on the same or a related topic.
+
+    Call this before web_search. If it returns enough relevant results, write
+    from them instead of searching again.
+
+    Args:
+        topic: The article topic or search query.
+        max_results: Maximum number of results to return (default 15).
+        min_overlap: Minimum word overlap (0-1) between the topic and a stored query (default 0.5).
+
+    Returns:
+        JSON with matching earlier queries and their results, deduplicated by
+        URL, plus existing_articles: catalog articles whose target keywords
+        match the topic (the pre-write cannibalization check).
+    """
+    from tools.analytics import keyword_collisions  # NumPy is loaded on the first lookup
+
+    found = keyword_collisions([topic], limit=5)
+    existing = found["same_keywords"] + found["overlapping_keyword_sets"]
+    words = set(cluster_key(topic).split())
+    if not words or not os.path.exists(_DB_FILE):
+        return json.dumps({"topic": topic, "queries": [], "results": [], "existing_articles": existing})
+
+    cutoff = time.time() - _freshness_seconds()
+    conn = _connect()
+    try:
+        matches = []
+        for key, query, fetched_at in conn.execute(
+            "SELECT query_key, query, fetched_at FROM searches WHERE fetched_at >= ?", (cutoff,)
+        ):
+            other = set(key.split())
+            overlap = len(words & other) / len(words | other)
+            if overlap >= min_overlap:
+                matches.append((overlap, key, query))
+        matches.sort(reverse=True)
+
+        results, seen = [], set()
+        for _, key, _ in matches:
+            for r in _results_for(conn, key, max_results):
+                if r["url"] in seen:
+                    continue
+                seen.add(r["url"])
+                results.append(r)
+            if len(results) >= max_results:
+                break
+    finally:
+        conn.close()
+
+    return json.dumps({
+        "topic": topic,
+        "queries": [q for _, _, q in matches],
+        "results": results[:max_results],
+        "existing_articles": existing,
+    })
@@ -0,0 +1,307 @@
+"""
+Article revision history -- delta-compressed, append-only.
+
+Every save or content update appends a revision to
+content/revisions/{id}.jsonl (content/revisions/{ab}/{cd}/{id}.jsonl in the
+sharded layout), one JSON line per revision:
+
+  {"rev": 3, "at": "...", "word_count": 1820, "kind": "delta", "data": "<base64 zlib>"}
+
+Most revisions are line-level deltas against the previous one (copy ranges
+from the old text plus inserted lines). Every _SNAPSHOT_EVERY revisions a
+full snapshot is stored instead, so rebuilding any revision replays at most
+that many deltas. A revision is also stored in full whenever its delta would
+not be smaller (small articles, rewrites). A delta is only applied on top of
+the revision right before it. If that entry is missing (a torn append was
+skipped), the revision can't be rebuilt, and a ValueError says so. The latest revision is always the article's .md file, so
+reading current content never touches this log.
+
+Used by storage.py (recording) and serve.py (list / diff / restore routes).
+storage.py imports this module lazily, inside its write functions, since this
+module imports from storage.
+"""
+
+import base64
+import difflib
+import json
+import os
+import zlib
+
+from tools.storage import _CONTENT_DIR, _get_layout, _shard, update_article_content
+
+
+_REVISIONS_DIR = os.path.join(_CONTENT_DIR, "revisions")
+_SNAPSHOT_EVERY = 10
+
+
+# ============================================================
+# Internal helpers
+# ============================================================
+
+
+def _log_path(article_id: str, layout: str = None) -> str:
+    """Path to an article's revision log (sharded like the .md files)."""
+    if (layout or _get_layout()) == "sharded":
+        return os.path.join(_REVISIONS_DIR, _shard(article_id), f"{article_id}.jsonl")
+    return os.path.join(_REVISIONS_DIR, f"{article_id}.jsonl")
+
+
+def _pack(payload) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 9)).decode("ascii")
+
+
+def _unpack(data: str):
+    return json.loads(zlib.decompress(base64.b64decode(data)).decode("utf-8"))
+
+
+def _make_delta(old: str, new: str) -> list:
+    """Line delta: [start, end] copies old lines, a string inserts text."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def _apply_delta(old: str, ops: list) -> str:
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+def _parse_lines(lines) -> list[dict]:
+    """Log entries from raw lines, skipping any that don't parse (e.g. a torn append)."""
+    entries = []
+    for line in lines:
+        if line.strip():
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+
+def _read_log(article_id: str) -> list[dict]:
+    try:
+        with open(_log_path(article_id), "r", encoding="utf-8") as f:
+            return _parse_lines(f)
+    except FileNotFoundError:
+        return []
+
+
+def _last_line(path: str) -> tuple[bytes, bool]:
+    """Last non-empty line of a file, read backwards in blocks until it's complete.
+
+    Returns the line and whether the file ends with a newline.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            step = min(65536, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            body = tail.rstrip(b"\n")
+            start = body.rfind(b"\n")
+            if start >= 0 or pos == 0:
+                return body[start + 1:], tail.endswith(b"\n")
+    return b"", True
+
+
+def _last_rev(path: str) -> tuple[int | None, bool]:
+    """Highest revision number in an existing log, and whether it ends with a newline.
+
+    Normally only the last line is read. If it doesn't parse (a torn append),
+    the whole log is scanned rather than treating the article as having no history.
+    """
+    line, clean_end = _last_line(path)
+    try:
+        return json.loads(line)["rev"], clean_end
+    except (json.JSONDecodeError, KeyError, TypeError, UnicodeDecodeError):
+        pass
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        revs = [e["rev"] for e in _parse_lines(f) if isinstance(e, dict) and "rev" in e]
+    return (max(revs) if revs else None), clean_end
+
+
+def _rebuild(entries: list[dict], rev: int) -> str | None:
+    """Reconstruct the text of revision `rev` from its log entries.
+
+    Returns None if the revision isn't in the log. Raises ValueError if it is
+    but its delta chain back to a full snapshot is broken.
+    """
+    target = next((i for i in range(len(entries) - 1, -1, -1) if entries[i]["rev"] == rev), None)
+    if target is None:
+        return None
+    # Walk back to the nearest full snapshot, through consecutive revisions only
+    start = target
+    while entries[start]["kind"] != "full":
+        if start == 0 or entries[start - 1]["rev"] != entries[start]["rev"] - 1:
+            raise ValueError(
+                f"Revision {rev} can't be rebuilt: revision {entries[start]['rev'] - 1}, "
+                "which its delta chain needs, is missing from the log."
+            )
+        start -= 1
+    text = _unpack(entries[start]["data"])
+    for entry in entries[start + 1:target + 1]:
+        text = _apply_delta(text, _unpack(entry["data"]))
+    return text
+
+
+# ============================================================
+# Public API (storage.py calls record_revision under its _lock)
+# ============================================================
+
+
+def record_revision(article_id: str, previous: str | None, current: str, at: str,
+                    word_count: int) -> int:
+    """Append a revision for `current`. Returns the new revision number.
+
+    `previous` is the content being replaced (None for a new article). It is
+    used as the delta base, so the log never has to be replayed on write.
+    """
+    path = _log_path(article_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    last_rev, clean_end = None, True
+    if previous is not None and os.path.exists(path):
+        last_rev, clean_end = _last_rev(path)
+
+    lines = []
+    if last_rev is None and previous is not None:
+        # Article predates revision history -- keep what it looked like as rev 1
+        lines.append({"rev": 1, "at": None, "word_count": len(previous.split()),
+                      "kind": "full", "data": _pack(previous)})
+        last_rev = 1
+
+    rev = last_rev + 1 if last_rev else 1
+    full = last_rev is None or rev % _SNAPSHOT_EVERY == 1
+    data = _pack(current)
+    if not full:
+        delta = _pack(_make_delta(previous, current))
+        full = len(delta) >= len(data)
+        if not full:
+            data = delta
+    lines.append({
+        "rev": rev,
+        "at": at,
+        "word_count": word_count,
+        "kind": "full" if full else "delta",
+        "data": data,
+    })
+    # A new article (previous is None) starts a fresh log
+    with open(path, "a" if previous is not None else "w", encoding="utf-8") as f:
+        if not clean_end:
+            f.write("\n")  # Don't glue the new entry onto a torn line
+        f.writelines(json.dumps(entry) + "\n" for entry in lines)
+    return rev
+
+
+def delete_revisions(article_id: str):
+    """Remove an article's revision log."""
+    try:
+        os.remove(_log_path(article_id))
+    except FileNotFoundError:
+        pass
+
+
+def list_revisions(article_id: str) -> list[dict]:
+    """Revision summaries (no content), oldest first."""
+    return [
+        {
+            "rev": e["rev"],
+            "at": e["at"],
+            "word_count": e.get("word_count"),
+            "kind": e["kind"],
+            "stored_bytes": len(e["data"]),
+        }
+        for e in _read_log(article_id)
+    ]
+
+
+def get_revision(article_id: str, rev: int) -> str | None:
+    """Full text of one revision, or None if it doesn't exist.
+
+    Raises ValueError if the revision exists but can't be rebuilt.
+    """
+    return _rebuild(_read_log(article_id), rev)
+
+
+def diff_revisions(article_id: str, from_rev: int, to_rev: int) -> str | None:
+    """Unified diff between two revisions, or None if either doesn't exist.
+
+    Raises ValueError if either exists but can't be rebuilt.
+    """
+    entries = _read_log(article_id)
+    old = _rebuild(entries, from_rev)
+    new = _rebuild(entries, to_rev)
+    if old is None or new is None:
+        return None
+    return "".join(difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile=f"{article_id}@{from_rev}",
+        tofile=f"{article_id}@{to_rev}",
+    ))
+
+
+def restore_revision(article_id: str, rev: int) -> str:
+    """Make an old revision current again (recorded as a new revision).
+
+    Returns:
+        JSON with article_id, restored_from, and updated word_count.
+    """
+    try:
+        text = get_revision(article_id, rev)
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+    if text is None:
+        return json.dumps({"error": f"Revision {rev} of {article_id} not found."})
+    result = json.loads(update_article_content(article_id, text))
+    if "error" not in result:
+        result["restored_from"] = rev
+    return json.dumps(result)
+
+
+def storage_stats(article_id: str) -> dict:
+    """Stored log size vs what full copies of every revision would cost.
+
+    Revisions whose delta chain is broken are counted as unreadable and left
+    out of full_copy_bytes.
+    """
+    entries = _read_log(article_id)
+    stored = sum(len(e["data"]) for e in entries)
+    full_copies = unreadable = 0
+    text, prev_rev = None, None
+    for entry in entries:
+        payload = _unpack(entry["data"])
+        if entry["kind"] == "full":
+            text = payload
+        elif text is not None and entry["rev"] == prev_rev + 1:
+            text = _apply_delta(text, payload)
+        else:
+            text = None
+        prev_rev = entry["rev"]
+        if text is None:
+            unreadable += 1
+        else:
+            full_copies += len(text.encode("utf-8"))
+    return {
+        "revisions": len(entries),
+        "unreadable": unreadable,
+        "stored_bytes": stored,
+        "full_copy_bytes": full_copies,
+        "ratio": round(stored / full_copies, 3) if full_copies else 0.0,
+    }
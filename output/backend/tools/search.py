@@ -2,6 +2,8 @@
 Web search via DataForSEO -- toolkit for researching topics.
 
 Used by the Content Writer agent to research topics before writing articles.
+Results are saved to the shared research store (research.py), and a repeated
+query is answered from the store while its results are fresh.
 """
 
 import json
@@ -10,6 +12,8 @@ import httpx
 from agno.tools import Toolkit
 from agno.utils.log import logger
 
+from tools.research import cached_search, store_search
+
 
 class DataForSEOSearchTools(Toolkit):
     """Web search via DataForSEO SERP API."""
@@ -29,6 +33,13 @@ class DataForSEOSearchTools(Toolkit):
         Returns:
             JSON list of search results with titles, URLs, and descriptions.
         """
+        try:
+            cached = cached_search(query, max_results)
+            if cached:
+                return json.dumps(cached)
+        except Exception as e:
+            logger.warning(f"Research store lookup failed: {e}")
+
         try:
             response = httpx.post(
                 f"{self.base_url}/serp/google/organic/live/advanced",
@@ -55,7 +66,13 @@ class DataForSEOSearchTools(Toolkit):
                         "url": item.get("url", ""),
                         "description": item.get("description", ""),
                     })
-            return json.dumps(results[:max_results])
+            results = results[:max_results]
         except Exception as e:
             logger.warning(f"DataForSEO web search failed: {e}")
             return json.dumps({"error": str(e)})
+
+        try:
+            store_search(query, results)
+        except Exception as e:
+            logger.warning(f"Could not save search results to the research store: {e}")
+        return json.dumps(results)
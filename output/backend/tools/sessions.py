@@ -0,0 +1,394 @@
+"""
+Chat session store -- tuning and upkeep for chat_sessions.db.
+
+The team persists every run (including full member responses) into one
+SQLite file via Agno's SqliteDb: a row per session in agno_sessions and a
+row per run in agno_runs (run_data). Agno releases before the runs table
+kept a session's runs in an agno_sessions.runs column instead, and Agno
+leaves that column in place on upgraded files, so both are handled. Left
+alone, the file only ever grows and every history load scans it. This module:
+  - switches the file to WAL mode so reads don't wait on writes
+  - indexes the session columns Agno filters and sorts by
+  - prunes sessions past a retention window (with their runs) and trims
+    large member responses in finished runs
+  - runs VACUUM in a background thread, at most once per interval
+  - reports file size and lookup latency
+
+Settings (all optional, read from the environment):
+  SESSION_RETENTION_DAYS          -- delete sessions idle longer than this (default 90, 0 = keep all)
+  SESSION_MAX_MEMBER_RESPONSE     -- trim member responses larger than this many chars (default 20000)
+  SESSION_MAINTENANCE_HOURS       -- hours between background prune + VACUUM runs (default 24)
+  SESSION_DB_FILE                 -- session DB path (default output/backend/chat_sessions.db)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from tools.filelock import FileLock
+
+
+# SESSION_DB_FILE overrides the location (used by the import profiler for a scratch DB)
+DB_FILE = os.path.normpath(
+    os.getenv("SESSION_DB_FILE") or os.path.join(os.path.dirname(__file__), "..", "chat_sessions.db")
+)
+SESSION_TABLE = "agno_sessions"
+RUNS_TABLE = "agno_runs"            # Agno's default runs table for SESSION_TABLE
+# Touched after each maintenance run; its mtime is the last-run time
+MAINTENANCE_STAMP = DB_FILE + ".maintained"
+# Held while a process runs maintenance, so only one server worker does it
+_maintenance_lock = FileLock(DB_FILE + ".maintenance.lock")
+
+# (index name, columns) -- created only if the columns exist in Agno's schema.
+# session_id needs none: it's the primary key.
+_INDEXES = [
+    ("idx_sessions_team_updated", ("team_id", "updated_at")),
+    ("idx_sessions_user_updated", ("user_id", "updated_at")),
+]
+# Created by earlier versions of this module; duplicates the primary-key index
+_OBSOLETE_INDEXES = ["idx_sessions_session_id"]
+
+# Runs in these states may still be resumed, so their member responses stay whole
+_OPEN_RUN_STATUSES = ("RUNNING", "PENDING", "PAUSED")
+
+_maintenance_thread = None
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read a non-negative integer setting from the environment."""
+    try:
+        return max(0, int(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+# ============================================================
+# Internal helpers
+# ============================================================
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a short-lived connection to the session DB."""
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def _table_columns(conn: sqlite3.Connection, table: str = SESSION_TABLE) -> set[str]:
+    """Column names of a table. Empty if Agno hasn't created it yet."""
+    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return {row[1] for row in rows}
+
+
+def _apply_pragmas():
+    """Enable WAL mode (persistent in the file) and create lookup indexes."""
+    os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
+    conn = _connect()
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _ensure_indexes(conn)
+    finally:
+        conn.close()
+
+
+def _ensure_indexes(conn: sqlite3.Connection):
+    """Create lookup indexes for whichever columns the table actually has."""
+    columns = _table_columns(conn)
+    if not columns:
+        return
+    for name in _OBSOLETE_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, cols in _INDEXES:
+        if set(cols) <= columns:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {SESSION_TABLE} ({', '.join(cols)})"
+            )
+    conn.commit()
+
+
+def _trim_member_responses(runs: list, max_chars: int) -> bool:
+    """Shrink oversized member responses in place. Returns True if anything changed.
+
+    The member's final content is kept (truncated); its message log and tool
+    payloads are dropped since the leader's own messages already hold the result.
+    """
+    changed = False
+    for run in runs:
+        if not isinstance(run, dict):
+            continue
+        for member in run.get("member_responses") or []:
+            if not isinstance(member, dict):
+                continue
+            if len(json.dumps(member, default=str)) <= max_chars:
+                continue
+            for key in ("messages", "tools", "reasoning_content", "reasoning_steps"):
+                if member.get(key):
+                    member[key] = None
+                    changed = True
+            content = member.get("content")
+            if isinstance(content, str) and len(content) > max_chars and not content.endswith("[truncated]"):
+                member["content"] = content[:max_chars] + "\n\n[truncated]"
+                changed = True
+    return changed
+
+
+def _trim_rows(conn: sqlite3.Connection, select_sql: str, update_sql: str, max_chars: int, wrap: bool) -> int:
+    """Trim the runs JSON in each selected (key, json) row. Returns rows rewritten.
+
+    With wrap, each value is one run (agno_runs.run_data); otherwise it's a
+    list of runs (the legacy agno_sessions.runs column).
+    """
+    trimmed = 0
+    for key, raw in conn.execute(select_sql, (max_chars,)).fetchall():
+        try:
+            value = json.loads(raw) if isinstance(raw, str) else None
+        except json.JSONDecodeError:
+            continue
+        runs = [value] if wrap else value
+        if isinstance(runs, list) and _trim_member_responses(runs, max_chars):
+            conn.execute(update_sql, (json.dumps(value, ensure_ascii=False), key))
+            trimmed += 1
+    return trimmed
+
+
+# ============================================================
+# Public API
+# ============================================================
+
+
+def build_session_db():
+    """Tune the session file and return the SqliteDb the team should use.
+
+    Agno's SqliteDb (and SQLAlchemy behind it) is imported here rather than at
+    module level, so the maintenance and report routes don't pay for it.
+    """
+    from agno.db.sqlite import SqliteDb
+
+    _apply_pragmas()
+    return SqliteDb(db_file=DB_FILE, session_table=SESSION_TABLE)
+
+
+def prune_sessions(retention_days: int = None, max_member_chars: int = None) -> dict:
+    """Delete expired sessions (and their runs) and trim large member responses.
+
+    Runs one write transaction, so Agno's own writes wait for it rather than
+    interleaving with a trim's read and rewrite of the same run.
+
+    Returns:
+        Dict with the number of sessions deleted and runs trimmed.
+    """
+    if retention_days is None:
+        retention_days = _env_int("SESSION_RETENTION_DAYS", 90)
+    if max_member_chars is None:
+        max_member_chars = _env_int("SESSION_MAX_MEMBER_RESPONSE", 20000)
+
+    if not os.path.exists(DB_FILE):
+        return {"deleted": 0, "trimmed": 0}
+
+    conn = _connect()
+    try:
+        columns = _table_columns(conn)
+        if not columns:
+            return {"deleted": 0, "trimmed": 0}
+        _ensure_indexes(conn)
+        run_columns = _table_columns(conn, RUNS_TABLE)
+
+        conn.execute("BEGIN IMMEDIATE")
+        deleted = 0
+        if retention_days and "updated_at" in columns:
+            cutoff = int(time.time()) - retention_days * 86400
+            expired = "COALESCE(updated_at, created_at) < ?"
+            if run_columns:
+                # Agno declares ON DELETE CASCADE, but it only fires with
+                # foreign_keys on, and older files have no constraint at all
+                conn.execute(
+                    f"DELETE FROM {RUNS_TABLE} WHERE session_id IN "
+                    f"(SELECT session_id FROM {SESSION_TABLE} WHERE {expired})",
+                    (cutoff,),
+                )
+            deleted = conn.execute(f"DELETE FROM {SESSION_TABLE} WHERE {expired}", (cutoff,)).rowcount
+
+        trimmed = 0
+        if max_member_chars and "run_data" in run_columns:
+            open_statuses = ", ".join(f"'{s}'" for s in _OPEN_RUN_STATUSES)
+            trimmed += _trim_rows(
+                conn,
+                f"SELECT run_id, run_data FROM {RUNS_TABLE} WHERE length(run_data) > ? "
+                f"AND COALESCE(status, '') NOT IN ({open_statuses})",
+                f"UPDATE {RUNS_TABLE} SET run_data = ? WHERE run_id = ?",
+                max_member_chars,
+                wrap=True,
+            )
+        if max_member_chars and "runs" in columns:
+            trimmed += _trim_rows(
+                conn,
+                f"SELECT session_id, runs FROM {SESSION_TABLE} WHERE length(runs) > ?",
+                f"UPDATE {SESSION_TABLE} SET runs = ? WHERE session_id = ?",
+                max_member_chars,
+                wrap=False,
+            )
+
+        conn.commit()
+        return {"deleted": deleted, "trimmed": trimmed}
+    finally:
+        conn.close()
+
+
+def vacuum_sessions():
+    """Reclaim free pages and fold the WAL back into the main file."""
+    if not os.path.exists(DB_FILE):
+        return
+    conn = _connect()
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def run_maintenance() -> dict:
+    """One prune + VACUUM pass. Safe to call while the server is running."""
+    started = time.perf_counter()
+    result = prune_sessions()
+    vacuum_sessions()
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    from agno.utils.log import logger  # Not at module level: serve imports this before agno is needed
+
+    logger.info(f"Session store maintenance: {result}")
+    return result
+
+
+def _last_maintenance() -> float | None:
+    try:
+        return os.path.getmtime(MAINTENANCE_STAMP)
+    except FileNotFoundError:
+        return None
+
+
+def _mark_maintenance():
+    with open(MAINTENANCE_STAMP, "a"):
+        pass
+    os.utime(MAINTENANCE_STAMP)
+
+
+def start_background_maintenance():
+    """Start a daemon thread that runs maintenance every SESSION_MAINTENANCE_HOURS.
+
+    The last run is stamped on disk, so a restart (or a dev auto-reload)
+    doesn't run VACUUM again while the server is starting. The first start
+    with no stamp waits one full interval. Every worker runs this loop, but
+    a due run takes _maintenance_lock without waiting and re-checks the
+    stamp, so exactly one of them runs it. No-op if already started or if
+    the interval is 0.
+    """
+    global _maintenance_thread
+    hours = _env_int("SESSION_MAINTENANCE_HOURS", 24)
+    if not hours or _maintenance_thread is not None:
+        return
+    interval = hours * 3600
+
+    def loop():
+        while True:
+            last = _last_maintenance()
+            if last is None:
+                _mark_maintenance()
+                last = time.time()
+            due_in = last + interval - time.time()
+            if due_in > 0:
+                time.sleep(due_in)
+                continue  # Re-read the stamp -- another process may have run it meanwhile
+            if not _maintenance_lock.acquire(blocking=False):
+                time.sleep(60)  # Another worker is running it
+                continue
+            try:
+                last = _last_maintenance()
+                if last is None or time.time() - last >= interval:
+                    try:
+                        run_maintenance()
+                    except Exception as e:
+                        from agno.utils.log import logger
+
+                        logger.warning(f"Session store maintenance failed: {e}")
+                    _mark_maintenance()
+            finally:
+                _maintenance_lock.release()
+
+    _maintenance_thread = threading.Thread(target=loop, name="session-maintenance", daemon=True)
+    _maintenance_thread.start()
+
+
+def session_store_report() -> dict:
+    """Size and latency report for the session store.
+
+    Returns:
+        Dict with file/WAL sizes, session count, largest sessions, journal
+        mode, index names, and the time to load the most recent session.
+    """
+    if not os.path.exists(DB_FILE):
+        return {"db_file": DB_FILE, "exists": False}
+
+    wal_file = DB_FILE + "-wal"
+    report = {
+        "db_file": DB_FILE,
+        "exists": True,
+        "file_bytes": os.path.getsize(DB_FILE),
+        "wal_bytes": os.path.getsize(wal_file) if os.path.exists(wal_file) else 0,
+    }
+
+    conn = _connect()
+    try:
+        report["journal_mode"] = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        report["free_bytes"] = page_size * free_pages
+
+        columns = _table_columns(conn)
+        if not columns:
+            report["sessions"] = 0
+            return report
+
+        report["sessions"] = conn.execute(f"SELECT COUNT(*) FROM {SESSION_TABLE}").fetchone()[0]
+        report["indexes"] = [
+            row[1] for row in conn.execute(f"PRAGMA index_list({SESSION_TABLE})").fetchall()
+        ]
+        run_columns = _table_columns(conn, RUNS_TABLE)
+        if "run_data" in run_columns:
+            report["runs"] = conn.execute(f"SELECT COUNT(*) FROM {RUNS_TABLE}").fetchone()[0]
+            largest_sql = (
+                f"SELECT session_id, SUM(length(run_data)) AS size FROM {RUNS_TABLE} "
+                "GROUP BY session_id ORDER BY size DESC LIMIT 5"
+            )
+        elif "runs" in columns:
+            largest_sql = (
+                f"SELECT session_id, length(runs) AS size FROM {SESSION_TABLE} "
+                "ORDER BY size DESC LIMIT 5"
+            )
+        else:
+            largest_sql = None
+        if largest_sql:
+            report["largest_sessions"] = [
+                {"session_id": sid, "runs_bytes": size}
+                for sid, size in conn.execute(largest_sql).fetchall()
+            ]
+
+        latest = conn.execute(
+            f"SELECT session_id FROM {SESSION_TABLE} ORDER BY updated_at DESC LIMIT 1"
+        ).fetchone()
+        if latest:
+            started = time.perf_counter()
+            conn.execute(
+                f"SELECT * FROM {SESSION_TABLE} WHERE session_id = ?", (latest[0],)
+            ).fetchall()
+            if "run_data" in run_columns:
+                conn.execute(
+                    f"SELECT run_data FROM {RUNS_TABLE} WHERE session_id = ? ORDER BY run_index",
+                    (latest[0],),
+                ).fetchall()
+            report["latest_lookup_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    finally:
+        conn.close()
+
+    return report
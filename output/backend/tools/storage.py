@@ -1,25 +1,86 @@
 """
 Local file storage -- article metadata in JSON, content in .md files.
 
-Articles are stored in the content/ directory:
+Articles are stored in the content/ directory (or $CONTENT_DIR if set):
   - content/articles.json  -- metadata (topic, keywords, status, word count)
   - content/{id}.md        -- full article Markdown
+  - content/revisions/     -- per-article revision history (see revisions.py)
+
+articles.json and .md files are replaced atomically (temp file + rename), so
+a reader never sees a half-written file. Each metadata entry records its
+latest revision number, which lets transfer.py export a consistent snapshot.
+Writes hold _lock, a lock on content/.lock that also excludes other server
+workers and the CLI tools, so concurrent saves never lose metadata or
+claim the same ID.
+
+Reads go through _load_records(), which keeps the parsed metadata as compact
+ArticleRecord objects until articles.json changes. Listings are serialized
+straight from those records (listing_json).
 
 Article IDs are keyword slugs like "on-page-seo-meta-tags".
+
+Large catalogs can switch to a sharded layout, where each .md file lives at
+content/md/{ab}/{cd}/{id}.md (ab, cd = first hex digits of the ID's hash),
+so no directory holds more than a few hundred files. The layout is recorded
+in content/layout and changed with tools/migrate_layout.py.
 """
 
+import hashlib
 import json
 import os
 import re
-import threading
 from datetime import datetime, timezone
 
+from tools import events
+from tools.filelock import FileLock
 
+
+# CONTENT_DIR overrides the location (used by the load test and benchmarks for scratch catalogs)
 _CONTENT_DIR = os.path.normpath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "..", "content")
+    os.getenv("CONTENT_DIR") or os.path.join(os.path.dirname(__file__), "..", "..", "..", "content")
 )
 _METADATA_FILE = os.path.join(_CONTENT_DIR, "articles.json")
-_lock = threading.Lock()
+_LAYOUT_FILE = os.path.join(_CONTENT_DIR, "layout")
+_SHARD_DIR = os.path.join(_CONTENT_DIR, "md")
+# Guards every read-modify-write of articles.json, the .md files, and the revision
+# logs -- across threads and across server workers / CLI tools (see filelock.py)
+_lock = FileLock(os.path.join(_CONTENT_DIR, ".lock"))
+
+_layout = None                      # "flat" or "sharded", read once from _LAYOUT_FILE
+_next_suffix: dict[str, int] = {}   # base slug -> next collision suffix to try (a per-process hint)
+
+_records_cache = None               # (articles.json stat key, {id: ArticleRecord})
+_listing_cache = None               # (records dict it was built from, listing JSON)
+
+
+class ArticleRecord:
+    """Catalog metadata for one article (no content), as used by listings.
+
+    Slotted, so a 100k-article catalog costs a few small objects per article
+    rather than a dict plus derived strings each time it's listed.
+    """
+
+    __slots__ = ("id", "topic", "keywords", "status", "word_count", "created_at", "updated_at")
+
+    def __init__(self, article_id: str, entry: dict):
+        self.id = article_id
+        self.topic = entry.get("topic", "")
+        self.keywords = entry.get("keywords", [])
+        self.status = entry.get("status", "review")
+        self.word_count = entry.get("word_count")
+        self.created_at = entry.get("created_at")
+        self.updated_at = entry.get("updated_at")
+
+    def summary(self) -> dict:
+        """Listing fields (the /api/articles response shape)."""
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "word_count": self.word_count,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
 
 
 # ============================================================
@@ -36,11 +97,39 @@ def _load_metadata() -> dict:
         return {}
 
 
+def _write_atomic(path: str, text: str):
+    """Write a file via a temp file + rename, so readers never see a partial write."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
 def _save_metadata(data: dict):
-    """Write articles.json directly (caller must hold _lock)."""
+    """Write articles.json atomically (caller must hold _lock)."""
     os.makedirs(_CONTENT_DIR, exist_ok=True)
-    with open(_METADATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    _write_atomic(_METADATA_FILE, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def _load_records() -> dict[str, ArticleRecord]:
+    """Catalog metadata as records, re-parsed only when articles.json changes.
+
+    Keyed by the file's mtime, size, and inode. Every save replaces the file
+    (see _write_atomic), so each write produces a new key. The stat happens
+    before the read, so a write that races it only causes one extra reload.
+    """
+    global _records_cache
+    try:
+        st = os.stat(_METADATA_FILE)
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        key = None
+    cached = _records_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    records = {article_id: ArticleRecord(article_id, entry) for article_id, entry in _load_metadata().items()}
+    _records_cache = (key, records)
+    return records
 
 
 def _now() -> str:
@@ -57,8 +146,15 @@ def _slugify(text: str) -> str:
     return text.strip('-')[:50]
 
 
-def _generate_id(keywords: str = "", topic: str = "") -> str:
-    """Generate article ID from keywords or topic as a slug."""
+def _generate_id(metadata: dict, keywords: str = "", topic: str = "") -> str:
+    """Generate a unique article ID from keywords or topic as a slug.
+
+    Collisions get a -2, -3, ... suffix. The next suffix per base slug is
+    remembered, so repeated collisions don't re-probe every earlier ID. The
+    hint is per process; every candidate is still checked against the
+    metadata and the disk, so another worker's IDs are never reused.
+    Caller must hold _lock and pass metadata read under it.
+    """
     source = keywords or topic
     if not source:
         source = datetime.now().strftime("%Y-%m-%d-%H%M%S")
@@ -67,19 +163,42 @@ def _generate_id(keywords: str = "", topic: str = "") -> str:
     if not base:
         base = datetime.now().strftime("%Y-%m-%d-%H%M%S")
 
-    path = os.path.join(_CONTENT_DIR, f"{base}.md")
-    if not os.path.exists(path):
+    def taken(candidate: str) -> bool:
+        # Metadata is authoritative; the file check catches orphaned .md files
+        return candidate in metadata or os.path.exists(_md_path(candidate))
+
+    if not taken(base):
         return base
     # Handle collision
-    for i in range(2, 100):
-        candidate = f"{base}-{i}"
-        if not os.path.exists(os.path.join(_CONTENT_DIR, f"{candidate}.md")):
-            return candidate
-    return base
+    i = _next_suffix.get(base, 2)
+    while taken(f"{base}-{i}"):
+        i += 1
+    _next_suffix[base] = i + 1
+    return f"{base}-{i}"
+
+
+def _get_layout() -> str:
+    """Current content layout ("flat" or "sharded")."""
+    global _layout
+    if _layout is None:
+        try:
+            with open(_LAYOUT_FILE, "r", encoding="utf-8") as f:
+                _layout = f.read().strip() or "flat"
+        except FileNotFoundError:
+            _layout = "flat"
+    return _layout
 
 
-def _md_path(article_id: str) -> str:
+def _shard(article_id: str) -> str:
+    """Relative shard directory for an ID, e.g. "3f/a2"."""
+    digest = hashlib.md5(article_id.encode("utf-8")).hexdigest()
+    return os.path.join(digest[:2], digest[2:4])
+
+
+def _md_path(article_id: str, layout: str = None) -> str:
     """Path to the .md file for an article."""
+    if (layout or _get_layout()) == "sharded":
+        return os.path.join(_SHARD_DIR, _shard(article_id), f"{article_id}.md")
     return os.path.join(_CONTENT_DIR, f"{article_id}.md")
 
 
@@ -90,9 +209,8 @@ def _md_path(article_id: str) -> str:
 
 def get_article(article_id: str) -> dict | None:
     """Fetch a single article by ID. Returns dict or None."""
-    metadata = _load_metadata()
-    entry = metadata.get(article_id)
-    if not entry:
+    record = _load_records().get(article_id)
+    if record is None:
         return None
 
     # Read content from .md file
@@ -103,40 +221,152 @@ def get_article(article_id: str) -> dict | None:
     except FileNotFoundError:
         content = ""
 
-    keywords = entry.get("keywords", [])
     return {
         "id": article_id,
-        "topic": entry.get("topic", ""),
-        "target_keywords": json.dumps(keywords) if keywords else None,
-        "status": entry.get("status", "review"),
+        "topic": record.topic,
+        "target_keywords": json.dumps(record.keywords) if record.keywords else None,
+        "status": record.status,
         "article_markdown": content,
         "output_file": md_file,
-        "word_count": entry.get("word_count"),
-        "created_at": entry.get("created_at"),
-        "updated_at": entry.get("updated_at"),
+        "word_count": record.word_count,
+        "created_at": record.created_at,
+        "updated_at": record.updated_at,
     }
 
 
 def list_articles(status: str = None) -> list[dict]:
     """List articles, optionally filtered by status."""
-    metadata = _load_metadata()
-    results = []
-    for article_id, entry in metadata.items():
-        if status and entry.get("status") != status:
-            continue
-        keywords = entry.get("keywords", [])
-        results.append({
-            "id": article_id,
-            "topic": entry.get("topic", ""),
-            "target_keywords": json.dumps(keywords) if keywords else None,
-            "status": entry.get("status", "review"),
+    return [
+        {
+            "id": r.id,
+            "topic": r.topic,
+            "target_keywords": json.dumps(r.keywords) if r.keywords else None,
+            "status": r.status,
             "article_markdown": None,  # Don't load content for listings
-            "output_file": _md_path(article_id),
-            "word_count": entry.get("word_count"),
-            "created_at": entry.get("created_at"),
-            "updated_at": entry.get("updated_at"),
-        })
-    return results
+            "output_file": _md_path(r.id),
+            "word_count": r.word_count,
+            "created_at": r.created_at,
+            "updated_at": r.updated_at,
+        }
+        for r in list_article_records(status)
+    ]
+
+
+def list_article_records(status: str = None) -> list[ArticleRecord]:
+    """List article records (cached, read-only), optionally filtered by status.
+
+    Cheaper than list_articles() for large catalogs: no dict or derived
+    strings per article. Don't modify the records -- they're shared.
+    """
+    records = _load_records().values()
+    if not status:
+        return list(records)
+    return [r for r in records if r.status == status]
+
+
+def listing_json(status: str = None) -> str:
+    """Article summaries as a JSON array -- the /api/articles body and list_all_articles result.
+
+    Serialized straight from the records. The unfiltered listing is cached
+    until articles.json changes.
+    """
+    global _listing_cache
+    records = _load_records()
+    cached = _listing_cache
+    if not status and cached is not None and cached[0] is records:
+        return cached[1]
+    text = json.dumps(
+        [r.summary() for r in records.values() if not status or r.status == status],
+        ensure_ascii=False,
+    )
+    if not status:
+        _listing_cache = (records, text)
+    return text
+
+
+def delete_article(article_id: str) -> bool:
+    """Delete an article's metadata, .md file, and revisions. Returns False if not found."""
+    from tools.revisions import delete_revisions
+
+    with _lock:
+        metadata = _load_metadata()
+        if article_id not in metadata:
+            return False
+        del metadata[article_id]
+        _save_metadata(metadata)
+
+        md_file = _md_path(article_id)
+        if os.path.exists(md_file):
+            os.remove(md_file)
+        delete_revisions(article_id)
+
+        events.publish("deleted", article_id)
+    return True
+
+
+def import_articles(records: list[dict], overwrite: bool = False) -> dict:
+    """Write a batch of exported articles under their original IDs (used by transfer.py).
+
+    articles.json is written once per batch rather than once per article.
+    Existing IDs are skipped unless overwrite is set.
+
+    Returns:
+        Counts of created, updated, and skipped articles.
+    """
+    from tools.revisions import record_revision
+
+    counts = {"created": 0, "updated": 0, "skipped": 0}
+    changes = []
+
+    with _lock:
+        metadata = _load_metadata()
+        for record in records:
+            article_id = record.get("id") or ""
+            existing = metadata.get(article_id)
+            # IDs become file names -- only accept slug characters
+            if not re.fullmatch(r"[\w-]+", article_id) or (existing and not overwrite):
+                counts["skipped"] += 1
+                continue
+
+            content = record.get("article_markdown") or ""
+            word_count = len(content.split())
+            keywords = record.get("keywords") or []
+            if isinstance(keywords, str):
+                keywords = [k.strip() for k in keywords.split(",") if k.strip()]
+            now = _now()
+
+            md_file = _md_path(article_id)
+            previous = None
+            if existing:
+                try:
+                    with open(md_file, "r", encoding="utf-8") as f:
+                        previous = f.read()
+                except FileNotFoundError:
+                    previous = ""
+            os.makedirs(os.path.dirname(md_file), exist_ok=True)
+            _write_atomic(md_file, content)
+            updated_at = record.get("updated_at") or now
+            rev = record_revision(article_id, previous, content, updated_at, word_count)
+
+            metadata[article_id] = {
+                "topic": record.get("topic", ""),
+                "keywords": keywords,
+                "status": record.get("status") or "review",
+                "word_count": word_count,
+                "created_at": record.get("created_at") or now,
+                "updated_at": updated_at,
+                "revision": rev,
+            }
+            kind = "updated" if existing else "created"
+            counts[kind] += 1
+            changes.append((kind, article_id, ArticleRecord(article_id, metadata[article_id]).summary()))
+
+        if changes:
+            _save_metadata(metadata)
+
+        for kind, article_id, summary in changes:
+            events.publish(kind, article_id, summary)
+    return counts
 
 
 # ============================================================
@@ -155,21 +385,23 @@ def save_article(topic: str, article_markdown: str, keywords: str = "") -> str:
     Returns:
         JSON with article_id, filename, and word_count.
     """
+    from tools.revisions import record_revision
+
     word_count = len(article_markdown.split())
     kw_list = [k.strip() for k in keywords.split(",") if k.strip()] if keywords else []
     now = _now()
 
     with _lock:
-        article_id = _generate_id(keywords=keywords, topic=topic)
-        os.makedirs(_CONTENT_DIR, exist_ok=True)
+        metadata = _load_metadata()
+        article_id = _generate_id(metadata, keywords=keywords, topic=topic)
 
         # Write .md file
         md_file = _md_path(article_id)
-        with open(md_file, "w", encoding="utf-8") as f:
-            f.write(article_markdown)
+        os.makedirs(os.path.dirname(md_file), exist_ok=True)
+        _write_atomic(md_file, article_markdown)
+        rev = record_revision(article_id, None, article_markdown, now, word_count)
 
         # Update metadata
-        metadata = _load_metadata()
         metadata[article_id] = {
             "topic": topic,
             "keywords": kw_list,
@@ -177,8 +409,10 @@ def save_article(topic: str, article_markdown: str, keywords: str = "") -> str:
             "word_count": word_count,
             "created_at": now,
             "updated_at": now,
+            "revision": rev,
         }
         _save_metadata(metadata)
+        events.publish("created", article_id, ArticleRecord(article_id, metadata[article_id]).summary())
 
     return json.dumps({
         "article_id": article_id,
@@ -198,18 +432,7 @@ def list_all_articles(status_filter: str = "") -> str:
     Returns:
         JSON array of article summaries.
     """
-    articles = list_articles(status=status_filter or None)
-    return json.dumps([
-        {
-            "id": a["id"],
-            "topic": a["topic"],
-            "status": a["status"],
-            "word_count": a["word_count"],
-            "created_at": a["created_at"],
-            "updated_at": a["updated_at"],
-        }
-        for a in articles
-    ])
+    return listing_json(status=status_filter or None)
 
 
 def get_article_content(article_id: str) -> str:
@@ -242,22 +465,34 @@ def update_article_content(article_id: str, article_markdown: str) -> str:
     Returns:
         JSON with article_id and updated word_count.
     """
+    from tools.revisions import record_revision
+
     word_count = len(article_markdown.split())
+    now = _now()
 
     with _lock:
         metadata = _load_metadata()
         if article_id not in metadata:
             return json.dumps({"error": f"Article {article_id} not found."})
 
-        # Write .md file
+        # Keep the old version as a revision before overwriting
         md_file = _md_path(article_id)
-        with open(md_file, "w", encoding="utf-8") as f:
-            f.write(article_markdown)
+        try:
+            with open(md_file, "r", encoding="utf-8") as f:
+                previous = f.read()
+        except FileNotFoundError:
+            previous = ""
+
+        # Write .md file
+        _write_atomic(md_file, article_markdown)
+        rev = record_revision(article_id, previous, article_markdown, now, word_count)
 
         # Update metadata
         metadata[article_id]["word_count"] = word_count
-        metadata[article_id]["updated_at"] = _now()
+        metadata[article_id]["updated_at"] = now
+        metadata[article_id]["revision"] = rev
         _save_metadata(metadata)
+        events.publish("updated", article_id, ArticleRecord(article_id, metadata[article_id]).summary())
 
     return json.dumps({
         "article_id": article_id,
@@ -0,0 +1,40 @@
+"""
+Shared word tokenizer for topic and keyword matching.
+
+Used by gap_analysis (concept extraction) and research (cluster keys, which
+clustering also uses to merge keywords), so the same words match the same
+way everywhere. Pure Python, no model calls.
+"""
+
+import re
+
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers herself him himself his how i if in into is it
+its itself just let me more most my myself no nor not now of off on once only or other our
+ours ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves
+may might must shall use used using via etc e.g i.e like well many much often one two
+include includes including refer refers referring help helps make makes get gets ensure ensures
+key important various different way ways new best good great""".split())
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+-]*(?:'[a-z]+)?")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with possessives dropped and light plural folding."""
+    tokens = []
+    for w in _WORD.findall(text.lower()):
+        w = w.split("'")[0]
+        if len(w) > 3 and w.endswith("s") and not w.endswith(("ss", "us", "is")) and w != "https":
+            w = w[:-1]
+        tokens.append(w)
+    return tokens
+
+
+def content_words(text: str) -> list[str]:
+    """tokenize() without stopwords, in order."""
+    return [t for t in tokenize(text) if t not in STOPWORDS]
@@ -0,0 +1,313 @@
+"""
+Catalog export and import -- streams articles one at a time.
+
+Export formats (GET /api/articles/export?format=..., or the CLI below):
+  ndjson  -- one JSON object per line: id, topic, keywords, status, word_count,
+             created_at, updated_at, article_markdown
+  tar     -- gzipped tar with articles/{id}.json (metadata) + articles/{id}.md
+  zip     -- same layout as tar
+
+Exports are a consistent snapshot without holding storage._lock while
+streaming. Metadata is read once under the lock, and then each article is
+read on its own. If an article's .md file was written after the snapshot, the
+version from the snapshot is rebuilt from its revision log instead. Articles
+deleted after the snapshot are left out.
+
+Imports keep article IDs and write in batches of _BATCH_SIZE, with one
+articles.json write per batch. Progress is checkpointed in
+content/.import-progress.json after each batch, so an interrupted import
+resumes where it stopped. Existing IDs are skipped unless --overwrite is given.
+
+Usage (from output/backend, server stopped for imports):
+    python -m tools.transfer export backup.ndjson    (.ndjson/.jsonl, .tar.gz/.tgz, .zip)
+    python -m tools.transfer import backup.ndjson [--overwrite]
+"""
+
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from collections.abc import Iterator
+
+from tools import storage
+from tools.revisions import get_revision, list_revisions
+
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "tar": ("application/gzip", "tar.gz"),
+    "zip": ("application/zip", "zip"),
+}
+
+_BATCH_SIZE = 500
+_PROGRESS_FILE = os.path.join(storage._CONTENT_DIR, ".import-progress.json")
+_METADATA_FIELDS = ("id", "topic", "keywords", "status", "word_count", "created_at", "updated_at")
+
+
+# ============================================================
+# Snapshot reads
+# ============================================================
+
+
+def _snapshot() -> tuple[dict, int]:
+    """Metadata plus the articles.json mtime, read together under the lock.
+
+    Any .md file written after the snapshot has an mtime >= that stamp.
+    """
+    with storage._lock:
+        metadata = storage._load_metadata()
+        try:
+            stamp = os.stat(storage._METADATA_FILE).st_mtime_ns
+        except FileNotFoundError:
+            stamp = 0
+    return metadata, stamp
+
+
+def _content_as_of(article_id: str, entry: dict, stamp: int) -> str | None:
+    """Article content as it was at the snapshot, or None if it's gone."""
+    try:
+        with open(storage._md_path(article_id), "r", encoding="utf-8") as f:
+            content = f.read()
+            changed = os.fstat(f.fileno()).st_mtime_ns >= stamp
+    except FileNotFoundError:
+        content, changed = None, True
+    if not changed:
+        return content
+
+    # Written since the snapshot (or at the same clock tick) -- use the logged revision
+    rev = entry.get("revision")
+    if rev is None:
+        matches = [r["rev"] for r in list_revisions(article_id) if r["at"] == entry.get("updated_at")]
+        rev = matches[-1] if matches else None
+    snapshot = get_revision(article_id, rev) if rev is not None else None
+    return snapshot if snapshot is not None else content
+
+
+def iter_articles() -> Iterator[dict]:
+    """Yield every article in the snapshot, one at a time, with its content."""
+    metadata, stamp = _snapshot()
+    for article_id, entry in metadata.items():
+        content = _content_as_of(article_id, entry, stamp)
+        if content is None:
+            continue
+        yield {
+            "id": article_id,
+            "topic": entry.get("topic", ""),
+            "keywords": entry.get("keywords", []),
+            "status": entry.get("status", "review"),
+            "word_count": entry.get("word_count"),
+            "created_at": entry.get("created_at"),
+            "updated_at": entry.get("updated_at"),
+            "article_markdown": content,
+        }
+
+
+# ============================================================
+# Export encoders (each yields bytes chunks)
+# ============================================================
+
+
+class _ChunkWriter:
+    """Write-only file object that collects output until it's taken."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _archive_entries(record: dict) -> list[tuple[str, bytes]]:
+    meta = {k: record[k] for k in _METADATA_FIELDS}
+    return [
+        (f"articles/{record['id']}.json", json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8")),
+        (f"articles/{record['id']}.md", record["article_markdown"].encode("utf-8")),
+    ]
+
+
+def export_ndjson() -> Iterator[bytes]:
+    for record in iter_articles():
+        yield (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def export_tar() -> Iterator[bytes]:
+    out = _ChunkWriter()
+    now = int(time.time())
+    with tarfile.open(fileobj=out, mode="w|gz") as tar:
+        for record in iter_articles():
+            for name, data in _archive_entries(record):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = now
+                tar.addfile(info, io.BytesIO(data))
+            yield out.take()
+    yield out.take()
+
+
+def export_zip() -> Iterator[bytes]:
+    out = _ChunkWriter()
+    # An unseekable output makes zipfile write data descriptors instead of seeking back
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for record in iter_articles():
+            for name, data in _archive_entries(record):
+                archive.writestr(name, data)
+            yield out.take()
+    yield out.take()
+
+
+def export_chunks(fmt: str) -> Iterator[bytes]:
+    """Export stream for a format in FORMATS."""
+    return {"ndjson": export_ndjson, "tar": export_tar, "zip": export_zip}[fmt]()
+
+
+# ============================================================
+# Import
+# ============================================================
+
+
+def _format_for(path: str) -> str:
+    name = path.lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith((".tar", ".tar.gz", ".tgz")):
+        return "tar"
+    if name.endswith(".zip"):
+        return "zip"
+    raise ValueError(f"Can't tell the format of '{path}'. Use .ndjson, .jsonl, .tar.gz, .tgz, or .zip.")
+
+
+def _pair_entries(entries: Iterator[tuple[str, bytes]]) -> Iterator[dict]:
+    """Join articles/{id}.json and articles/{id}.md archive entries into records."""
+    pending: dict[str, dict] = {}
+    for name, data in entries:
+        base = os.path.basename(name)
+        article_id, ext = os.path.splitext(base)
+        record = pending.setdefault(article_id, {"id": article_id})
+        if ext == ".json":
+            record.update(json.loads(data.decode("utf-8")), id=article_id)
+        elif ext == ".md":
+            record["article_markdown"] = data.decode("utf-8")
+        else:
+            continue
+        if "topic" in record and "article_markdown" in record:
+            yield pending.pop(article_id)
+
+
+def _read_records(path: str, skip: int = 0) -> Iterator[dict]:
+    """Yield import records from an export file, one at a time, after the first `skip`."""
+    fmt = _format_for(path)
+    if fmt == "ndjson":
+        with open(path, "r", encoding="utf-8") as f:
+            lines = (line for line in f if line.strip())
+            for index, line in enumerate(lines):
+                if index >= skip:  # Skipped lines aren't parsed
+                    yield json.loads(line)
+        return
+    if fmt == "tar":
+        with tarfile.open(path, "r|*") as tar:
+            records = _pair_entries(
+                (member.name, tar.extractfile(member).read()) for member in tar if member.isfile()
+            )
+            for index, record in enumerate(records):
+                if index >= skip:
+                    yield record
+        return
+    with zipfile.ZipFile(path) as archive:
+        records = _pair_entries(
+            (info.filename, archive.read(info)) for info in archive.infolist() if not info.is_dir()
+        )
+        for index, record in enumerate(records):
+            if index >= skip:
+                yield record
+
+
+def _source_key(path: str) -> str:
+    """Progress key -- a changed file starts over."""
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _load_progress() -> dict:
+    try:
+        with open(_PROGRESS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_progress(key: str, done: int | None):
+    progress = _load_progress()
+    if done is None:
+        progress.pop(key, None)
+    else:
+        progress[key] = done
+    os.makedirs(storage._CONTENT_DIR, exist_ok=True)
+    storage._write_atomic(_PROGRESS_FILE, json.dumps(progress, indent=2))
+
+
+def import_file(path: str, overwrite: bool = False) -> dict:
+    """Import an export file, resuming from the last checkpoint for that file.
+
+    Returns:
+        Counts of created, updated, and skipped articles, plus how many records
+        were already done by an earlier run.
+    """
+    key = _source_key(path)
+    resumed = done = _load_progress().get(key, 0)
+    totals = {"created": 0, "updated": 0, "skipped": 0}
+
+    def flush(batch: list[dict]):
+        nonlocal done
+        for name, count in storage.import_articles(batch, overwrite=overwrite).items():
+            totals[name] += count
+        done += len(batch)
+        _save_progress(key, done)
+        print(f"  {done} records imported", file=sys.stderr)
+
+    batch = []
+    for record in _read_records(path, skip=resumed):
+        batch.append(record)
+        if len(batch) >= _BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    _save_progress(key, None)
+    return {**totals, "resumed_from": resumed}
+
+
+def export_file(path: str) -> dict:
+    """Write an export to disk. The format comes from the file extension."""
+    fmt = _format_for(path)
+    tmp = f"{path}.tmp"
+    written = 0
+    with open(tmp, "wb") as f:
+        for chunk in export_chunks(fmt):
+            f.write(chunk)
+            written += len(chunk)
+    os.replace(tmp, path)
+    return {"file": path, "format": fmt, "bytes": written}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) == 2 and args[0] == "export":
+        print(export_file(args[1]))
+    elif len(args) in (2, 3) and args[0] == "import" and args[2:] in ([], ["--overwrite"]):
+        print(import_file(args[1], overwrite=args[2:] == ["--overwrite"]))
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -1,17 +1,15 @@
-import { useState, useEffect, useCallback, useRef } from "react";
-import { listArticles } from "./api";
+import { useState, useCallback, useRef } from "react";
 import Chat from "./components/Chat";
 import ArticleList from "./components/ArticleList";
 import ArticleView from "./components/ArticleView";
 import Toast from "./components/Toast";
+import { listArticles } from "./api";
 import "./App.css";
 
 export default function App() {
   const [selectedArticle, setSelectedArticle] = useState(null);
-  const [refreshKey, setRefreshKey] = useState(0);
   const [newArticleIds, setNewArticleIds] = useState(new Set());
   const [toast, setToast] = useState(null);
-  const knownIdsRef = useRef(new Set());
   const [theme, setTheme] = useState(() => localStorage.getItem('theme') || 'dark');
 
   const toggleTheme = useCallback(() => {
@@ -23,51 +21,53 @@ export default function App() {
     });
   }, []);
 
-  // Populate known article IDs on mount
-  useEffect(() => {
-    listArticles()
-      .then((articles) => {
-        knownIdsRef.current = new Set(articles.map((a) => a.id));
-      })
-      .catch(() => {});
+  // Articles created during the current team run, collected from the
+  // article event stream (ArticleList's subscription). Events can be missed
+  // (stream reconnecting) or land after the run completes (another worker's
+  // save reaches this stream on the next 0.5s poll), so handleRunComplete
+  // checks them against one list fetch.
+  const runActiveRef = useRef(false);
+  const runCreatedRef = useRef(new Map());
+
+  const handleArticleEvent = useCallback(({ type, id, article }) => {
+    if (!runActiveRef.current) return;
+    if (type === "created") runCreatedRef.current.set(id, article);
+    else if (type === "deleted") runCreatedRef.current.delete(id);
   }, []);
 
-  // Called right before a team run starts — snapshot current articles so
-  // the diff after the run only picks up articles created during THIS run
-  const handleRunStart = useCallback(async () => {
-    try {
-      const articles = await listArticles();
-      knownIdsRef.current = new Set(articles.map((a) => a.id));
-    } catch {
-      // If fetch fails, keep whatever knownIdsRef already has
-    }
+  // Called right before a team run starts
+  const handleRunStart = useCallback(() => {
+    runCreatedRef.current = new Map();
+    runActiveRef.current = true;
     setNewArticleIds(new Set());
   }, []);
 
-  // Called when a team run completes — diff articles to find new ones
-  const handleRunComplete = useCallback(async () => {
-    try {
-      const articles = await listArticles();
-      const currentIds = new Set(articles.map((a) => a.id));
-      const created = articles.filter((a) => !knownIdsRef.current.has(a.id));
-
-      if (created.length > 0) {
-        setNewArticleIds((prev) => {
-          const next = new Set(prev);
-          created.forEach((a) => next.add(a.id));
-          return next;
-        });
-        const noun = created.length === 1 ? "article" : "articles";
-        setToast(`${created.length} ${noun} created`);
+  // Called when a team run completes (startedAt: server time the run began)
+  // -- report the articles it created
+  const handleRunComplete = useCallback(async (startedAt) => {
+    runActiveRef.current = false;
+    const byId = new Map(runCreatedRef.current);
+    if (startedAt) {
+      try {
+        const articles = await listArticles();
+        const listed = new Set(articles.map((a) => a.id));
+        for (const id of byId.keys()) {
+          if (!listed.has(id)) byId.delete(id);
+        }
+        for (const a of articles) {
+          if (a.created_at && a.created_at >= startedAt) byId.set(a.id, a);
+        }
+      } catch {
+        // Keep what the event stream delivered
       }
-
-      knownIdsRef.current = currentIds;
-      setRefreshKey((k) => k + 1);
-      return created;
-    } catch {
-      setRefreshKey((k) => k + 1);
-      return [];
     }
+    const created = [...byId.values()];
+    if (created.length > 0) {
+      setNewArticleIds(new Set(created.map((a) => a.id)));
+      const noun = created.length === 1 ? "article" : "articles";
+      setToast(`${created.length} ${noun} created`);
+    }
+    return created;
   }, []);
 
   const handleSelect = useCallback((article) => {
@@ -84,8 +84,8 @@ export default function App() {
           </button>
         </div>
         <ArticleList
-          refreshKey={refreshKey}
           onSelect={handleSelect}
+          onArticleEvent={handleArticleEvent}
           selectedId={selectedArticle?.id}
           newArticleIds={newArticleIds}
         />
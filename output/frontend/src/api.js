@@ -15,6 +15,29 @@ export async function deleteArticle(id) {
   return res.json();
 }
 
+/**
+ * Subscribe to article change events (created / updated / deleted) pushed
+ * by the backend over SSE. EventSource reconnects on its own; onOpen fires
+ * on every (re)connect so callers can resync anything missed meanwhile.
+ *
+ * Returns an unsubscribe function.
+ */
+export function subscribeArticleEvents({ onEvent, onOpen }) {
+  const source = new EventSource(`${BASE}/api/articles/events`);
+  const handle = (e) => {
+    try {
+      onEvent?.(JSON.parse(e.data));
+    } catch {
+      // Skip malformed JSON
+    }
+  };
+  for (const type of ["created", "updated", "deleted"]) {
+    source.addEventListener(type, handle);
+  }
+  source.onopen = () => onOpen?.();
+  return () => source.close();
+}
+
 /**
  * Stream a team run via SSE. Uses our custom /api/chat/stream endpoint
  * which wraps team.arun() in SSE events (TeamMode.tasks doesn't support
@@ -22,7 +45,8 @@ export async function deleteArticle(id) {
  *
  * Callbacks:
  *   onChunk(text)  — called with each content delta (append to message)
- *   onDone(text)   — called with full final text when run completes
+ *   onDone(text, { startedAt }) — called with full final text when run completes;
+ *                    startedAt is the server's run start time (created_at format)
  *   onError(msg)   — called on error
  */
 export async function streamTeamRun(prompt, { onChunk, onDone, onError }) {
@@ -43,6 +67,7 @@ export async function streamTeamRun(prompt, { onChunk, onDone, onError }) {
     const decoder = new TextDecoder();
     let buffer = "";
     let fullText = "";
+    let startedAt = null;
 
     while (true) {
       const { done, value } = await reader.read();
@@ -75,7 +100,9 @@ export async function streamTeamRun(prompt, { onChunk, onDone, onError }) {
         try {
           const data = JSON.parse(dataStr);
 
-          if (eventName === "TeamRunContent" && data.content) {
+          if (eventName === "TeamRunStarted") {
+            startedAt = data.started_at || null;
+          } else if (eventName === "TeamRunContent" && data.content) {
             fullText += data.content;
             onChunk?.(data.content);
           } else if (eventName === "TeamRunCompleted") {
@@ -83,7 +110,7 @@ export async function streamTeamRun(prompt, { onChunk, onDone, onError }) {
             if (data.content) {
               fullText = data.content;
             }
-            onDone?.(fullText);
+            onDone?.(fullText, { startedAt });
             return;
           } else if (eventName === "TeamRunError") {
             onError?.(data.content || "Unknown error");
@@ -96,7 +123,7 @@ export async function streamTeamRun(prompt, { onChunk, onDone, onError }) {
     }
 
     // Stream ended without TeamRunCompleted — still call onDone
-    onDone?.(fullText);
+    onDone?.(fullText, { startedAt });
   } catch (err) {
     onError?.(err.message);
   }
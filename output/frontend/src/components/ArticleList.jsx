@@ -1,10 +1,10 @@
-import { useState, useEffect } from "react";
-import { listArticles, deleteArticle } from "../api";
+import { useState, useEffect, useRef } from "react";
+import { listArticles, deleteArticle, subscribeArticleEvents } from "../api";
 import "./ArticleList.css";
 
 export default function ArticleList({
-  refreshKey,
   onSelect,
+  onArticleEvent,
   selectedId,
   newArticleIds,
 }) {
@@ -12,14 +12,29 @@ export default function ArticleList({
 
   useEffect(() => {
     listArticles().then(setArticles).catch(() => {});
-  }, [refreshKey]);
+  }, []);
+
+  // Latest callback, without resubscribing when the parent re-renders
+  const onArticleEventRef = useRef(onArticleEvent);
+  onArticleEventRef.current = onArticleEvent;
 
-  // Poll every 10s for new articles
+  // Apply pushed changes instead of polling; resync the full list on reconnect
   useEffect(() => {
-    const id = setInterval(() => {
-      listArticles().then(setArticles).catch(() => {});
-    }, 10000);
-    return () => clearInterval(id);
+    let connected = false;
+    return subscribeArticleEvents({
+      onOpen: () => {
+        if (connected) listArticles().then(setArticles).catch(() => {});
+        connected = true;
+      },
+      onEvent: (event) => {
+        const { type, id, article } = event;
+        onArticleEventRef.current?.(event);
+        setArticles((prev) => {
+          const rest = prev.filter((a) => a.id !== id);
+          return type === "deleted" ? rest : [...rest, article];
+        });
+      },
+    });
   }, []);
 
   async function handleDelete(e, articleId) {
@@ -29,7 +29,22 @@ function AIOResultCard({ json }) {
         <span className="aio-card-label">AI Overview</span>
         <span className="aio-card-keyword">{data.keyword}</span>
       </div>
-      <div className="aio-card-content">{data.content}</div>
+      {data.content ? (
+        <div className="aio-card-content">{data.content}</div>
+      ) : typeof data.coverage === "number" && (
+        <div className="aio-card-content">
+          <div className="aio-card-coverage">
+            Article covers {Math.round(data.coverage * 100)}% of this AI Overview
+          </div>
+          {data.missing_concepts?.length > 0 && (
+            <ul className="aio-card-missing">
+              {data.missing_concepts.map((concept, i) => (
+                <li key={i}>{typeof concept === "string" ? concept : concept.concept}</li>
+              ))}
+            </ul>
+          )}
+        </div>
+      )}
       {data.references?.length > 0 && (
         <div className="aio-card-refs">
           <span className="aio-card-refs-label">Sources</span>
@@ -107,7 +122,7 @@ export default function Chat({ onRunStart, onRunComplete, onSelectArticle }) {
           });
         }
       },
-      async onDone(fullText) {
+      async onDone(fullText, { startedAt }) {
         if (streamingRef.current) {
           setMessages((prev) => {
             const updated = [...prev];
@@ -127,7 +142,7 @@ export default function Chat({ onRunStart, onRunComplete, onSelectArticle }) {
         setLoading(false);
 
         if (onRunComplete) {
-          const created = await onRunComplete();
+          const created = await onRunComplete(startedAt);
           if (created && created.length > 0) {
             setMessages((prev) => {
               const msgIndex = prev.length - 1;
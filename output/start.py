@@ -1,26 +1,63 @@
-"""Start both backend and frontend in one command."""
+"""Start both backend and frontend in one command.
 
+Usage:
+    python output/start.py                        Dev: auto-reloading backend + Vite dev server
+    python output/start.py --prod [--workers 4]   Production: backend workers serve the built frontend
+    python output/start.py --prod --host 0.0.0.0  ...reachable from other machines (opt-in)
+
+Production mode builds frontend/dist if it's missing (or with --build), then
+runs serve.py with N worker processes and supervises it:
+  - readiness: waits for /health before reporting the URL
+  - liveness:  polls /health every few seconds, restarts after 3 failures in a row
+  - crashes:   restarts with backoff (uvicorn also replaces crashed workers itself)
+  - SIGTERM / Ctrl+C: the backend stops accepting connections and in-flight
+    chat streams get SHUTDOWN_DRAIN_SECONDS (default 120) to finish. On
+    Windows, where SIGTERM would be TerminateProcess, the backend runs in its
+    own process group and is sent CTRL_BREAK_EVENT instead (uvicorn and
+    serve.py treat SIGBREAK like SIGTERM).
+
+It binds to localhost and runs one worker unless told otherwise. The article
+routes (delete, restore, export) have no authentication, so only bind to a
+public interface behind something that adds it.
+"""
+
+import argparse
 import os
+import shutil
 import signal
 import subprocess
 import sys
+import time
+import urllib.request
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
 BACKEND_DIR = os.path.join(ROOT, "backend")
 FRONTEND_DIR = os.path.join(ROOT, "frontend")
 
-def main():
-    # Validate API key
-    from dotenv import load_dotenv
-    load_dotenv(os.path.join(os.path.dirname(ROOT), ".env"))
-    if not os.environ.get("ANTHROPIC_API_KEY"):
-        print("ERROR: ANTHROPIC_API_KEY not set. Add it to your .env file.")
+LIVENESS_INTERVAL = 5       # Seconds between /health checks once ready
+LIVENESS_FAILURES = 3       # Consecutive failed checks before a restart
+READY_TIMEOUT = 120         # Seconds a (re)started backend has to pass /health
+MAX_BACKOFF = 30            # Longest wait between restarts
+
+
+def npm(*args: str) -> list[str]:
+    """An npm command line, with npm resolved on PATH (npm.cmd on Windows) so no shell is needed."""
+    path = shutil.which("npm")
+    if path is None:
+        print("ERROR: npm not found. Install Node.js to run the frontend.")
         sys.exit(1)
+    return [path, *args]
+
 
+def install_frontend_deps():
     # Auto-install frontend deps if needed
     if not os.path.isdir(os.path.join(FRONTEND_DIR, "node_modules")):
         print("Installing frontend dependencies...")
-        subprocess.run(["npm", "install"], cwd=FRONTEND_DIR, shell=True, check=True)
+        subprocess.run(npm("install"), cwd=FRONTEND_DIR, check=True)
+
+
+def run_dev():
+    install_frontend_deps()
 
     print("Starting backend (port 7777) and frontend (port 5173)...")
     print("  Backend:  http://localhost:7777")
@@ -32,11 +69,7 @@ def main():
         [sys.executable, os.path.join(BACKEND_DIR, "serve.py")],
         cwd=BACKEND_DIR,
     )
-    frontend = subprocess.Popen(
-        ["npm", "run", "dev"],
-        cwd=FRONTEND_DIR,
-        shell=True,
-    )
+    frontend = subprocess.Popen(npm("run", "dev"), cwd=FRONTEND_DIR)
 
     try:
         backend.wait()
@@ -51,5 +84,135 @@ def main():
                 proc.kill()
 
 
+# ============================================================
+# Production mode
+# ============================================================
+
+
+def drain_seconds() -> int:
+    try:
+        return max(0, int(os.getenv("SHUTDOWN_DRAIN_SECONDS", "").strip() or 120))
+    except ValueError:
+        return 120
+
+
+def healthy(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=3) as res:
+            return res.status == 200
+    except Exception:
+        return False
+
+
+def stop_backend(proc: subprocess.Popen):
+    """SIGTERM (CTRL_BREAK_EVENT on Windows), wait for the drain window, then kill."""
+    if proc.poll() is not None:
+        return
+    proc.send_signal(signal.CTRL_BREAK_EVENT if os.name == "nt" else signal.SIGTERM)
+    try:
+        proc.wait(timeout=drain_seconds() + 10)
+    except subprocess.TimeoutExpired:
+        print("Backend did not stop in time -- killing it.")
+        proc.kill()
+        proc.wait()
+
+
+def run_prod(args):
+    index = os.path.join(FRONTEND_DIR, "dist", "index.html")
+    if args.build or not os.path.exists(index):
+        install_frontend_deps()
+        print("Building frontend...")
+        subprocess.run(npm("run", "build"), cwd=FRONTEND_DIR, check=True)
+
+    if args.host not in ("localhost", "127.0.0.1", "::1"):
+        print(f"WARNING: binding to {args.host} -- the article API (delete, restore, export) "
+              "has no authentication and is reachable from the network.\n")
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    health_url = f"http://{'localhost' if args.host in ('0.0.0.0', '::') else args.host}:{args.port}/health"
+    command = [
+        sys.executable, os.path.join(BACKEND_DIR, "serve.py"),
+        "--workers", str(args.workers), "--host", args.host, "--port", str(args.port),
+    ]
+    backoff = 1
+
+    while not stopping:
+        print(f"Starting backend ({args.workers} workers) on {args.host}:{args.port}...")
+        # Own process group, so Ctrl+C reaches the backend only via stop_backend's signal
+        # (on Windows, CTRL_BREAK_EVENT can only target a process group)
+        backend = subprocess.Popen(
+            command,
+            cwd=BACKEND_DIR,
+            start_new_session=os.name == "posix",
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == "nt" else 0,
+        )
+        started = time.monotonic()
+
+        # Readiness
+        ready = False
+        while not stopping and backend.poll() is None and time.monotonic() - started < READY_TIMEOUT:
+            if healthy(health_url):
+                ready = True
+                break
+            time.sleep(0.5)
+        if ready:
+            print(f"Ready in {time.monotonic() - started:.1f}s -- http://localhost:{args.port}")
+            print("  Press Ctrl+C to stop (in-flight chats are allowed to finish).\n")
+            backoff = 1
+
+        # Liveness
+        failures = 0
+        while ready and not stopping and backend.poll() is None:
+            time.sleep(LIVENESS_INTERVAL)
+            if stopping or backend.poll() is not None:
+                break
+            failures = 0 if healthy(health_url) else failures + 1
+            if failures >= LIVENESS_FAILURES:
+                print(f"Backend failed {failures} health checks in a row -- restarting.")
+                break
+
+        stop_backend(backend)
+        if stopping:
+            break
+        if not ready:
+            print(f"Backend exited or never became ready (exit code {backend.returncode}).")
+        print(f"Restarting in {backoff}s...")
+        time.sleep(backoff)
+        backoff = min(backoff * 2, MAX_BACKOFF)
+
+    print("Stopped.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start the SEO Workspace")
+    parser.add_argument("--prod", action="store_true", help="Production mode (workers + built frontend)")
+    parser.add_argument("--workers", type=int, default=1, help="Backend worker processes in --prod mode (default 1)")
+    parser.add_argument("--host", default="localhost",
+                        help="Bind address in --prod mode (default localhost; 0.0.0.0 exposes it to the network)")
+    parser.add_argument("--port", type=int, default=7777, help="Port in --prod mode")
+    parser.add_argument("--build", action="store_true", help="Rebuild the frontend before starting (--prod)")
+    args = parser.parse_args()
+
+    # Validate API key
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(ROOT), ".env"))
+    if not os.environ.get("ANTHROPIC_API_KEY"):
+        print("ERROR: ANTHROPIC_API_KEY not set. Add it to your .env file.")
+        sys.exit(1)
+
+    if args.prod:
+        run_prod(args)
+    else:
+        run_dev()
+
+
 if __name__ == "__main__":
     main()